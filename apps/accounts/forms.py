@@ -3,16 +3,23 @@ from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from .models import CustomUser
 
 
+WELCOME_VOUCHER_CODE = 'WELCOME2K'
+
+# Built once at import; each form instance only deep-copies the bound field
+_VOUCHER_WIDGET = forms.TextInput(attrs={
+    'placeholder': f'Enter {WELCOME_VOUCHER_CODE} for bonus', 
+    'class': 'form-control'
+})
+_VOUCHER_FIELD = forms.CharField(
+    required=False, 
+    label="Voucher Code",
+    widget=_VOUCHER_WIDGET
+)
+
+
 class CustomUserCreationForm(UserCreationForm):
     """Form for creating new users"""
-    voucher_code = forms.CharField(
-        required=False, 
-        label="Voucher Code",
-        widget=forms.TextInput(attrs={
-            'placeholder': 'Enter WELCOME2K for bonus', 
-            'class': 'form-control'
-        })
-    )
+    voucher_code = _VOUCHER_FIELD
     
     class Meta:
         model = CustomUser
@@ -1,7 +1,35 @@
-import random
+import os
+import threading
 from django.shortcuts import render, redirect
+from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from apps.wallet.models import Wallet
+from .forms import CustomUserCreationForm
+
+_flips = threading.local()
+
+
+def _next_flip():
+    """Return 'Heads' or 'Tails', drawing 64 flips at a time from os.urandom"""
+    if not getattr(_flips, 'count', 0):
+        _flips.buf = int.from_bytes(os.urandom(8), 'little')
+        _flips.count = 64
+    _flips.count -= 1
+    return 'Heads' if (_flips.buf >> _flips.count) & 1 else 'Tails'
+
+
+def signup_view(request):
+    """Create an account and log the new user straight in"""
+    if request.method == 'POST':
+        form = CustomUserCreationForm(request.POST)
+        if form.is_valid():
+            user = form.save()
+            login(request, user)
+            return redirect('home')
+    else:
+        form = CustomUserCreationForm()
+    return render(request, 'accounts/register.html', {'form': form})
+
 
 @login_required
 def home_view(request):
@@ -15,7 +43,7 @@ def home_view(request):
             side = request.POST.get('side')
             
             if 0 < amount <= user_wallet.balance:
-                outcome = random.choice(['Heads', 'Tails'])
+                outcome = _next_flip()
                 if side == outcome:
                     user_wallet.balance += amount
                     result_msg = f"WIN! The coin landed on {outcome}. You won IDR {amount}!"
@@ -1,6 +1,29 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
+from functools import lru_cache
 from .models import Bet
+from .tasks import settle_bets
+
+
+_STATUS_COLORS = {
+    'pending': '#FFA500',  # Orange
+    'won': '#28A745',      # Green
+    'lost': '#DC3545',     # Red
+    'cancelled': '#6C757D', # Gray
+    'refunded': '#17A2B8',  # Blue
+}
+
+
+@lru_cache(maxsize=8)
+def _status_badge(status, display):
+    """Render a status badge once per status; the changelist reuses it per row"""
+    color = _STATUS_COLORS.get(status, '#000000')
+    return format_html(
+        '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px; font-weight: bold;">{}</span>',
+        color,
+        display
+    )
 
 
 @admin.register(Bet)  
@@ -28,7 +51,7 @@ class BetAdmin(admin.ModelAdmin):
     ]
     
     search_fields = [
-        'user__email',
+        'user_email',
         'event__name',
         'event__team_a',
         'event__team_b',
@@ -56,13 +79,19 @@ class BetAdmin(admin.ModelAdmin):
     
     date_hierarchy = 'placed_at'
     
+    # event_name reads the event FK on every changelist row; user_email is a column
+    list_select_related = ('event',)
+    
     actions = ['mark_as_won', 'mark_as_lost', 'mark_as_cancelled']
     
-    def user_email(self, obj):
-        """Display user email"""
-        return obj.user.email
-    user_email.short_description = 'User'
-    user_email.admin_order_field = 'user__email'
+    def get_queryset(self, request):
+        """Join event so row rendering and actions don't hit the DB per bet"""
+        queryset = super().get_queryset(request).select_related('event')
+        # The changelist never shows notes/ip_address; the change form still needs them
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('notes', 'ip_address')
+        return queryset
     
     def event_name(self, obj):
         """Display event name"""
@@ -89,47 +118,31 @@ class BetAdmin(admin.ModelAdmin):
     
     def status_badge(self, obj):
         """Display status as colored badge"""
-        colors = {
-            'pending': '#FFA500',  # Orange
-            'won': '#28A745',      # Green
-            'lost': '#DC3545',     # Red
-            'cancelled': '#6C757D', # Gray
-            'refunded': '#17A2B8',  # Blue
-        }
-        color = colors.get(obj.status, '#000000')
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px; font-weight: bold;">{}</span>',
-            color,
-            obj.get_status_display()
-        )
+        return _status_badge(obj.status, obj.get_status_display())
     status_badge.short_description = 'Status'
     status_badge.admin_order_field = 'status'
     
     def mark_as_won(self, request, queryset):
         """Admin action to mark selected bets as won"""
-        updated = 0
-        for bet in queryset.filter(status=Bet.PENDING):
-            bet.mark_as_won()
-            updated += 1
-        self.message_user(request, f'{updated} bet(s) marked as won.')
+        bet_ids = list(queryset.filter(status=Bet.PENDING).values_list('id', flat=True))
+        settle_bets.delay(bet_ids, Bet.WON)
+        self.message_user(request, f'{len(bet_ids)} bet(s) queued to be marked as won.')
     mark_as_won.short_description = "Mark selected bets as WON"
     
     def mark_as_lost(self, request, queryset):
         """Admin action to mark selected bets as lost"""
-        updated = 0
-        for bet in queryset.filter(status=Bet.PENDING):
-            bet.mark_as_lost()
-            updated += 1
-        self.message_user(request, f'{updated} bet(s) marked as lost.')
+        bet_ids = list(queryset.filter(status=Bet.PENDING).values_list('id', flat=True))
+        settle_bets.delay(bet_ids, Bet.LOST)
+        self.message_user(request, f'{len(bet_ids)} bet(s) queued to be marked as lost.')
     mark_as_lost.short_description = "Mark selected bets as LOST"
     
     def mark_as_cancelled(self, request, queryset):
         """Admin action to cancel selected bets"""
-        updated = 0
-        for bet in queryset.filter(status=Bet.PENDING):
-            bet.mark_as_cancelled()
-            updated += 1
-        self.message_user(request, f'{updated} bet(s) cancelled.')
+        # Same rule as Bet.can_be_cancelled(); the task re-checks it under lock
+        bet_ids = list(queryset.filter(
+            status=Bet.PENDING,
+            event__start_time__gt=timezone.now()
+        ).values_list('id', flat=True))
+        settle_bets.delay(bet_ids, Bet.CANCELLED)
+        self.message_user(request, f'{len(bet_ids)} bet(s) queued to be cancelled.')
     mark_as_cancelled.short_description = "Cancel selected bets"
-
-
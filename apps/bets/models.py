@@ -1,11 +1,22 @@
 from django.db import models
 from django.conf import settings  
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.core.validators import MinValueValidator
 from django.utils import timezone
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from apps.events.models import Event
 
 
+CENT = Decimal('0.01')
+
+
+def calculate_payout(stake, odds):
+    """Potential payout (stake * odds), rounded half up to the cent"""
+    return (stake * odds).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
 class Bet(models.Model):
     """
     Represents a bet placed by a user on an event
@@ -41,6 +52,27 @@ class Bet(models.Model):
         (VOID, 'Void'),
     ]
     
+    SETTLED_STATUSES = frozenset((WON, LOST, CANCELLED, VOID))
+    
+    USER_STATS_CACHE_KEY = 'bet_stats:{}'
+    USER_STATS_CACHE_TIMEOUT = 300
+    
+    STATUS_BADGE_CLASSES = {
+        PENDING: 'warning',
+        WON: 'success',
+        LOST: 'danger',
+        CANCELLED: 'secondary',
+        VOID: 'info',
+    }
+    
+    STATUS_ICONS = {
+        PENDING: '⏳',
+        WON: '✅',
+        LOST: '❌',
+        CANCELLED: '🚫',
+        VOID: '↩️',
+    }
+    
     # Core Fields
     user = models.ForeignKey(
     settings.AUTH_USER_MODEL, 
@@ -52,6 +84,13 @@ class Bet(models.Model):
         on_delete=models.CASCADE, 
         related_name='bets'
     )
+    # Copied from user at creation so the admin changelist needs no join
+    user_email = models.CharField(
+        max_length=254,
+        db_index=True,
+        editable=False,
+        default=''
+    )
     
     # Bet Details
     bet_type = models.CharField(
@@ -106,6 +145,8 @@ class Bet(models.Model):
             models.Index(fields=['user', '-placed_at']),
             models.Index(fields=['event', 'status']),
             models.Index(fields=['status']),
+            # get_recent_wins: filter (user, status), order by -settled_at
+            models.Index(fields=['user', 'status', '-settled_at'], name='bet_user_status_settled_idx'),
         ]
         verbose_name = 'Bet'
         verbose_name_plural = 'Bets'
@@ -114,10 +155,13 @@ class Bet(models.Model):
         return f"{self.user.username} - {self.get_bet_type_display()} on {self.event} - ${self.stake}"
     
     def save(self, *args, **kwargs):
-        """Override save to auto-calculate potential payout if not set"""
+        """Override save to auto-calculate potential payout and copy user email"""
         if not self.potential_payout:
-            self.potential_payout = self.stake * self.odds
+            self.potential_payout = calculate_payout(self.stake, self.odds)
+        if self.pk is None and not self.user_email:
+            self.user_email = self.user.email
         super().save(*args, **kwargs)
+        self.invalidate_user_stats(self.user_id)
     
     # Status Check Methods
     def is_pending(self):
@@ -126,7 +170,7 @@ class Bet(models.Model):
     
     def is_settled(self):
         """Check if bet has been settled"""
-        return self.status in [self.WON, self.LOST, self.CANCELLED, self.VOID]
+        return self.status in self.SETTLED_STATUSES
     
     def can_be_cancelled(self):
         """
@@ -197,25 +241,11 @@ class Bet(models.Model):
     # Display Methods
     def get_status_badge_class(self):
         """Return CSS class for status badge"""
-        status_classes = {
-            self.PENDING: 'warning',
-            self.WON: 'success',
-            self.LOST: 'danger',
-            self.CANCELLED: 'secondary',
-            self.VOID: 'info',
-        }
-        return status_classes.get(self.status, 'secondary')
+        return self.STATUS_BADGE_CLASSES.get(self.status, 'secondary')
     
     def get_status_icon(self):
         """Return icon for status"""
-        status_icons = {
-            self.PENDING: '⏳',
-            self.WON: '✅',
-            self.LOST: '❌',
-            self.CANCELLED: '🚫',
-            self.VOID: '↩️',
-        }
-        return status_icons.get(self.status, '❓')
+        return self.STATUS_ICONS.get(self.status, '❓')
     
     # Class Methods for Statistics
     @classmethod
@@ -226,17 +256,32 @@ class Bet(models.Model):
         """
         from django.db.models import Sum, Count, Avg, Q
         
-        bets = cls.objects.filter(user=user)
+        key = cls.USER_STATS_CACHE_KEY.format(user.id)
+        stats = cache.get(key)
+        if stats is not None:
+            return stats
+        
+        # One aggregate query instead of a separate count/sum per stat
+        totals = cls.objects.filter(user=user).aggregate(
+            total_bets=Count('id'),
+            pending_bets=Count('id', filter=Q(status=cls.PENDING)),
+            won_bets=Count('id', filter=Q(status=cls.WON)),
+            lost_bets=Count('id', filter=Q(status=cls.LOST)),
+            total_staked=Sum('stake'),
+            total_won=Sum('actual_payout', filter=Q(status=cls.WON)),
+            total_pending_stake=Sum('stake', filter=Q(status=cls.PENDING)),
+            avg_odds=Avg('odds'),
+        )
         
-        total_bets = bets.count()
-        pending_bets = bets.filter(status=cls.PENDING).count()
-        won_bets = bets.filter(status=cls.WON).count()
-        lost_bets = bets.filter(status=cls.LOST).count()
+        total_bets = totals['total_bets']
+        pending_bets = totals['pending_bets']
+        won_bets = totals['won_bets']
+        lost_bets = totals['lost_bets']
         
         # Financial stats
-        total_staked = bets.aggregate(total=Sum('stake'))['total'] or Decimal('0.00')
-        total_won = bets.filter(status=cls.WON).aggregate(total=Sum('actual_payout'))['total'] or Decimal('0.00')
-        total_pending_stake = bets.filter(status=cls.PENDING).aggregate(total=Sum('stake'))['total'] or Decimal('0.00')
+        total_staked = totals['total_staked'] or Decimal('0.00')
+        total_won = totals['total_won'] or Decimal('0.00')
+        total_pending_stake = totals['total_pending_stake'] or Decimal('0.00')
         
         # Calculate net profit/loss
         net_profit = total_won - (total_staked - total_pending_stake)
@@ -246,9 +291,9 @@ class Bet(models.Model):
         win_rate = (won_bets / settled_bets * 100) if settled_bets > 0 else Decimal('0.00')
         
         # Average odds
-        avg_odds = bets.aggregate(avg=Avg('odds'))['avg'] or Decimal('0.00')
+        avg_odds = totals['avg_odds'] or Decimal('0.00')
         
-        return {
+        stats = {
             'total_bets': total_bets,
             'pending_bets': pending_bets,
             'won_bets': won_bets,
@@ -260,6 +305,13 @@ class Bet(models.Model):
             'win_rate': round(win_rate, 2),
             'avg_odds': round(avg_odds, 2),
         }
+        cache.set(key, stats, cls.USER_STATS_CACHE_TIMEOUT)
+        return stats
+    
+    @classmethod
+    def invalidate_user_stats(cls, *user_ids):
+        """Drop cached get_user_stats results for the given users"""
+        cache.delete_many([cls.USER_STATS_CACHE_KEY.format(user_id) for user_id in user_ids])
     
     @classmethod
     def get_pending_bets_for_event(cls, event):
@@ -273,3 +325,9 @@ class Bet(models.Model):
             user=user, 
             status=cls.WON
         ).order_by('-settled_at')[:limit]
+
+
+@receiver(post_delete, sender=Bet)
+def invalidate_stats_on_delete(sender, instance, **kwargs):
+    """Deleted bets change the owner's stats too; save() covers the rest"""
+    Bet.invalidate_user_stats(instance.user_id)
@@ -0,0 +1,62 @@
+from config.celery import shared_task
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from decimal import Decimal
+from apps.wallet.models import Transaction, WalletManager
+from .models import Bet
+
+SETTLE_CHUNK_SIZE = 500
+
+
+@shared_task
+def settle_bets(bet_ids, outcome):
+    """
+    Settle bets in chunks, each chunk in its own atomic block
+    outcome: Bet.WON, Bet.LOST or Bet.CANCELLED
+    Returns: number of bets settled
+    """
+    if outcome not in (Bet.WON, Bet.LOST, Bet.CANCELLED):
+        raise ValueError(f"Cannot settle bets as '{outcome}'")
+    
+    settled = 0
+    for start in range(0, len(bet_ids), SETTLE_CHUNK_SIZE):
+        settled += _settle_chunk(bet_ids[start:start + SETTLE_CHUNK_SIZE], outcome)
+    return settled
+
+
+def _settle_chunk(bet_ids, outcome):
+    """Settle one chunk of bets with a single UPDATE and one batched wallet credit"""
+    now = timezone.now()
+    with transaction.atomic():
+        pending = Bet.objects.select_for_update(of=('self',)).filter(pk__in=bet_ids, status=Bet.PENDING)
+        if outcome == Bet.CANCELLED:
+            # Same rule as Bet.can_be_cancelled(): event not started yet
+            pending = pending.filter(event__start_time__gt=now)
+        rows = list(pending.values_list('user_id', 'potential_payout', 'stake', 'id'))
+        
+        # auto_now doesn't fire on update(), so set updated_at here
+        fields = {'status': outcome, 'settled_at': now, 'updated_at': now}
+        credit_kwargs = {}
+        if outcome == Bet.WON:
+            fields['actual_payout'] = F('potential_payout')
+            credits = [(user_id, payout, bet_id) for user_id, payout, _, bet_id in rows]
+        elif outcome == Bet.LOST:
+            fields['actual_payout'] = Decimal('0.00')
+            credits = []
+        else:
+            # Refund stakes; booked as refunds so they don't count as wins
+            credits = [(user_id, stake, bet_id) for user_id, _, stake, bet_id in rows]
+            credit_kwargs = {'category': Transaction.REFUND, 'description': "Bet refund"}
+        
+        if credits:
+            # Bets whose wallet is missing or inactive got no money, leave them pending
+            credited = set(WalletManager.process_bet_winnings_bulk(credits, **credit_kwargs))
+            rows = [row for row in rows if row[-1] in credited]
+        settle_ids = [row[-1] for row in rows]
+        
+        updated = Bet.objects.filter(pk__in=settle_ids).update(**fields)
+        # update() skips Bet.save(), so drop the cached stats after commit
+        user_ids = {row[0] for row in rows}
+        transaction.on_commit(lambda: Bet.invalidate_user_stats(*user_ids))
+    return updated
@@ -7,7 +7,7 @@ from django.db.models import Sum, Q
 from decimal import Decimal
 from apps.events.models import Event
 from apps.wallet.models import Wallet, WalletManager
-from .models import Bet
+from .models import Bet, calculate_payout
 from .forms import PlaceBetForm, BetFilterForm
 
 
@@ -57,7 +57,7 @@ def place_bet(request, event_id):
                     bet.user = request.user
                     bet.event = event
                     bet.odds = odds
-                    bet.potential_payout = stake * odds
+                    bet.potential_payout = calculate_payout(stake, odds)
                     
                     # Get user's IP address
                     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -216,7 +216,7 @@ def calculate_payout_api(request):
         event = Event.objects.get(id=event_id)
         odds = event.get_odds_for_bet_type(bet_type) if hasattr(event, 'get_odds_for_bet_type') else Decimal('2.00')
         
-        potential_payout = stake * odds
+        potential_payout = calculate_payout(stake, odds)
         profit = potential_payout - stake
         
         return JsonResponse({
@@ -9,12 +9,21 @@ class WalletAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['created_at', 'updated_at']
     list_filter = ['created_at']
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    list_per_page = 50
 
 
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ['reference_id', 'wallet', 'transaction_type', 'amount', 'status', 'created_at']
-    list_filter = ['transaction_type', 'status', 'created_at']
+    list_filter = ['transaction_type', 'category', 'status', 'created_at']
     search_fields = ['reference_id', 'wallet__user__username', 'description']
     readonly_fields = ['id', 'reference_id', 'created_at']
     date_hierarchy = 'created_at'
+    # wallet.__str__ reads the user, so join both
+    list_select_related = ('wallet', 'wallet__user')
+    raw_id_fields = ('wallet',)
+    list_per_page = 50
+    # Skip the unfiltered COUNT(*) over the whole ledger
+    show_full_result_count = False
@@ -0,0 +1,35 @@
+from django import forms
+from django.core import validators
+from decimal import Decimal
+
+
+class FundsForm(forms.Form):
+    """
+    Validates the amount posted by the Withdraw modal
+    """
+    amount = forms.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=Decimal('0.01'),
+        error_messages={
+            'required': 'Please enter an amount',
+            'invalid': 'Please enter a valid amount',
+            'min_value': 'Amount must be greater than zero',
+        }
+    )
+
+
+class DepositForm(FundsForm):
+    """
+    Validates the amount posted by the Add Funds modal
+    """
+    MAX_AMOUNT = Decimal('10000')
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Same field as FundsForm plus a cap; fields are per-instance copies
+        amount = self.fields['amount']
+        amount.max_value = self.MAX_AMOUNT
+        amount.validators.append(validators.MaxValueValidator(self.MAX_AMOUNT))
+        amount.error_messages['max_value'] = 'Maximum deposit amount is $10,000'
+        amount.widget.attrs['max'] = str(self.MAX_AMOUNT)
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+from decimal import Decimal
+from apps.wallet.models import Wallet, Transaction
+
+TOTAL_FIELDS = ['total_deposited', 'total_withdrawn', 'transaction_count',
+                'total_bets', 'total_wins', 'total_winnings']
+
+
+class Command(BaseCommand):
+    """
+    Fill the running-total columns for wallets created before they existed
+    Usage: python manage.py backfill_wallet_totals [--batch-size 1000]
+    """
+    help = "Recompute wallet running totals from the transaction ledger"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        updated = 0
+        for wallet in Wallet.objects.only('pk').iterator(chunk_size=batch_size):
+            ledger = wallet.get_ledger_totals()
+            bets = wallet.transactions.aggregate(
+                bets=Count('id', filter=Q(category=Transaction.BET_PLACED)),
+                wins=Count('id', filter=Q(category=Transaction.BET_WON)),
+                winnings=Sum('amount', filter=Q(
+                    category=Transaction.BET_WON,
+                    status=Transaction.COMPLETED
+                )),
+            )
+            wallet.total_deposited = ledger['deposited']
+            wallet.total_withdrawn = ledger['withdrawn']
+            wallet.transaction_count = ledger['count']
+            wallet.total_bets = bets['bets']
+            wallet.total_wins = bets['wins']
+            wallet.total_winnings = bets['winnings'] or Decimal('0.00')
+            batch.append(wallet)
+            
+            if len(batch) >= batch_size:
+                updated += self._flush(batch)
+        updated += self._flush(batch)
+        self.stdout.write(self.style.SUCCESS(f"Backfilled totals for {updated} wallets"))
+    
+    def _flush(self, batch):
+        Wallet.objects.bulk_update(batch, TOTAL_FIELDS)
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from apps.wallet.models import Wallet, Transaction, WalletManager
+
+
+class Command(BaseCommand):
+    """
+    Walk a demo user's wallet through a deposit, a bet, a win and a withdrawal
+    Usage: python manage.py seed_wallet_demo [--email testuser@example.com]
+    """
+    help = "Seed demo wallet activity for a user"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default='testuser@example.com')
+    
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['email']}' does not exist")
+        
+        WalletManager.create_wallet_for_user(user)
+        
+        Wallet.credit_user(user, Decimal('100.00'), 'Credit card deposit', Transaction.DEPOSIT)
+        for success, message, _ in (
+            WalletManager.process_bet_placement(user, Decimal('20.00')),
+            WalletManager.process_bet_winning(user, Decimal('45.00'), bet_id=12345),
+        ):
+            if not success:
+                raise CommandError(message)
+        Wallet.deduct_user(user, Decimal('50.00'), 'Bank withdrawal', Transaction.WITHDRAWAL)
+        
+        self.stdout.write(self.style.SUCCESS(f"Seeded demo wallet activity for {user.email}"))
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, router, transaction as db_transaction
+from django.db.models import F
 from apps.accounts.models import CustomUser
+from django.core.cache import cache
 from django.core.validators import MinValueValidator
-from django.db.models import F
 from decimal import Decimal
+from itertools import islice
 from django.utils import timezone
 
 
@@ -22,6 +24,20 @@ class Wallet(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    # Running totals kept in step with the ledger by credit()/deduct()
+    total_deposited = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_withdrawn = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    total_winnings = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    transaction_count = models.PositiveIntegerField(default=0)
+    # Bet counters, the precomputed source for the stats endpoint
+    total_bets = models.PositiveIntegerField(default=0)
+    total_wins = models.PositiveIntegerField(default=0)
+    
+    # Short-lived caches for the polled balance/stats endpoints
+    BALANCE_CACHE_KEY = 'wallet:bal:{}'
+    STATS_CACHE_KEY = 'wallet:stats:{}'
+    API_CACHE_TIMEOUT = 3
+    
     class Meta:
         db_table = 'wallets'
         ordering = ['-created_at']
@@ -33,66 +49,154 @@ class Wallet(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Wallet - Balance: {self.balance} {self.currency}"
     
+    @classmethod
+    def invalidate_cache(cls, *user_ids):
+        """Drop cached balance/stats API responses for the given users"""
+        cache.delete_many([
+            key.format(user_id)
+            for user_id in user_ids
+            for key in (cls.BALANCE_CACHE_KEY, cls.STATS_CACHE_KEY)
+        ])
+    
     def has_sufficient_balance(self, amount):
         """Check if wallet has enough balance for a transaction"""
         return self.balance >= Decimal(str(amount))
     
-    def deduct(self, amount, description=""):
+    def deduct(self, amount, description="", category=None):
         """
         Deduct amount from wallet (for placing bets)
         Returns: Transaction object if successful, None otherwise
         """
         amount = Decimal(str(amount))
-        if not self.has_sufficient_balance(amount):
-            raise ValueError(f"Insufficient balance. Available: {self.balance}, Required: {amount}")
-        
-        self.balance = F('balance') - amount
-        self.save(update_fields=['balance', 'updated_at'])
-        self.refresh_from_db()
-        
-        # Create transaction record
-        transaction = Transaction.objects.create(
-            wallet=self,
-            transaction_type=Transaction.DEBIT,
-            amount=amount,
-            balance_after=self.balance,
-            description=description or "Bet placed"
-        )
-        return transaction
+        return self._record(Transaction.DEBIT, amount, description or "Bet placed", category)
     
-    def credit(self, amount, description=""):
+    def credit(self, amount, description="", category=None):
         """
         Add amount to wallet (for winnings or deposits)
         Returns: Transaction object
         """
         amount = Decimal(str(amount))
-        self.balance = F('balance') + amount
-        self.save(update_fields=['balance', 'updated_at'])
-        self.refresh_from_db()
-        
-        # Create transaction record
-        transaction = Transaction.objects.create(
-            wallet=self,
-            transaction_type=Transaction.CREDIT,
-            amount=amount,
-            balance_after=self.balance,
-            description=description or "Amount credited"
+        return self._record(Transaction.CREDIT, amount, description or "Amount credited", category)
+    
+    @classmethod
+    def credit_user(cls, user, amount, description="", category=None):
+        """
+        Credit the user's wallet without loading it first
+        Returns: (Transaction, new_balance); raises Wallet.DoesNotExist
+        """
+        amount = Decimal(str(amount))
+        transaction, new_balance, _ = cls._apply(
+            cls.objects.filter(user=user), Transaction.CREDIT, amount,
+            description or "Amount credited", category
         )
+        return transaction, new_balance
+    
+    @classmethod
+    def deduct_user(cls, user, amount, description="", category=None):
+        """
+        Deduct from the user's wallet without loading it first
+        Returns: (Transaction, new_balance); raises ValueError or Wallet.DoesNotExist
+        """
+        amount = Decimal(str(amount))
+        transaction, new_balance, _ = cls._apply(
+            cls.objects.filter(user=user), Transaction.DEBIT, amount,
+            description or "Bet placed", category
+        )
+        return transaction, new_balance
+    
+    def _record(self, transaction_type, amount, description, category):
+        """Apply a balance change to this wallet and keep the instance in step"""
+        transaction, self.balance, counters = Wallet._apply(
+            Wallet.objects.filter(pk=self.pk), transaction_type, amount, description, category
+        )
+        for field, delta in counters.items():
+            setattr(self, field, getattr(self, field) + delta)
         return transaction
     
+    @classmethod
+    def _apply(cls, wallets, transaction_type, amount, description, category):
+        """
+        Apply a balance change, bump the running totals and write the ledger row
+        wallets: queryset matching a single wallet
+        The balance moves in one conditional UPDATE, so it stays correct even
+        when the caller hasn't locked the row; a debit that would overdraw
+        matches no row and raises ValueError
+        Returns: (Transaction, new_balance, counter deltas applied)
+        """
+        category = category or Transaction.OTHER
+        target = wallets
+        if transaction_type == Transaction.CREDIT:
+            balance = F('balance') + amount
+            counters = {'total_deposited': amount}
+        else:
+            target = wallets.filter(balance__gte=amount)
+            balance = F('balance') - amount
+            counters = {'total_withdrawn': amount}
+        if category == Transaction.BET_PLACED:
+            counters['total_bets'] = 1
+        elif category == Transaction.BET_WON:
+            counters['total_winnings'] = amount
+            counters['total_wins'] = 1
+        counters['transaction_count'] = 1
+        
+        with db_transaction.atomic():
+            updated = target.update(
+                balance=balance,
+                updated_at=timezone.now(),
+                **{field: F(field) + delta for field, delta in counters.items()}
+            )
+            # The UPDATE holds the row lock until commit, so this read is exact
+            row = wallets.values_list('id', 'user_id', 'balance').first()
+            if row is None:
+                raise cls.DoesNotExist("Wallet not found")
+            wallet_id, user_id, new_balance = row
+            if not updated:
+                raise ValueError(f"Insufficient balance. Available: {new_balance}, Required: {amount}")
+            
+            # Create transaction record
+            transaction = Transaction.objects.create(
+                wallet_id=wallet_id,
+                transaction_type=transaction_type,
+                amount=amount,
+                balance_after=new_balance,
+                description=description,
+                category=category
+            )
+            # Drop the cache only once the outermost transaction commits, so
+            # a read in between can't re-cache the old balance
+            db_transaction.on_commit(lambda: cls.invalidate_cache(user_id))
+        return transaction, new_balance, counters
+    
+    def get_ledger_totals(self):
+        """
+        Total deposited, total withdrawn and transaction count in one query
+        Recomputed from the ledger; the total_* columns are the fast path
+        Returns: dict with 'deposited', 'withdrawn' and 'count'
+        """
+        totals = self.transactions.aggregate(
+            deposited=models.Sum('amount', filter=models.Q(
+                transaction_type=Transaction.CREDIT,
+                status=Transaction.COMPLETED
+            )),
+            withdrawn=models.Sum('amount', filter=models.Q(
+                transaction_type=Transaction.DEBIT,
+                status=Transaction.COMPLETED
+            )),
+            count=models.Count('id'),
+        )
+        return {
+            'deposited': totals['deposited'] or Decimal('0.00'),
+            'withdrawn': totals['withdrawn'] or Decimal('0.00'),
+            'count': totals['count'],
+        }
+    
     def get_total_deposited(self):
-        """Calculate total amount deposited"""
-        return self.transactions.filter(
-            transaction_type=Transaction.CREDIT,
-            status=Transaction.COMPLETED
-        ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
+        """Total amount deposited"""
+        return self.total_deposited
     
     def get_total_withdrawn(self):
-        """Calculate total amount withdrawn"""
-        return self.transactions.filter(
-            transaction_type=Transaction.DEBIT,
-            status=Transaction.COMPLETED
-        ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
+        """Total amount withdrawn"""
+        return self.total_withdrawn
 
 
 class Transaction(models.Model):
@@ -117,12 +221,29 @@ class Transaction(models.Model):
         (CANCELLED, 'Cancelled'),
     ]
     
+    # What the money moved for; replaces matching on description text
+    BET_PLACED = 'bet_placed'
+    BET_WON = 'bet_won'
+    DEPOSIT = 'deposit'
+    WITHDRAWAL = 'withdrawal'
+    REFUND = 'refund'
+    OTHER = 'other'
+    CATEGORY_CHOICES = [
+        (BET_PLACED, 'Bet Placed'),
+        (BET_WON, 'Bet Won'),
+        (REFUND, 'Refund'),
+        (DEPOSIT, 'Deposit'),
+        (WITHDRAWAL, 'Withdrawal'),
+        (OTHER, 'Other'),
+    ]
+    
     wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='transactions')
     transaction_type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
     amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
     balance_after = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.CharField(max_length=255)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=COMPLETED)
+    category = models.CharField(max_length=16, choices=CATEGORY_CHOICES, default=OTHER, db_index=True)
     reference_id = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -133,6 +254,9 @@ class Transaction(models.Model):
             models.Index(fields=['wallet', '-created_at']),
             models.Index(fields=['transaction_type']),
             models.Index(fields=['status']),
+            models.Index(fields=['wallet', 'category', 'status']),
+            models.Index(fields=['wallet', 'transaction_type', 'status', '-created_at'], name='tx_w_type_status_dt'),
+            models.Index(fields=['reference_id']),
         ]
     
     def __str__(self):
@@ -152,12 +276,21 @@ class WalletManager:
     Manager class for wallet operations using OOP principles
     """
     
+    SUMMARY_FIELDS = (
+        'balance', 'currency', 'total_deposited', 'total_withdrawn',
+        'total_winnings', 'is_active', 'created_at', 'transaction_count',
+    )
+    
     @staticmethod
     def create_wallet_for_user(user, initial_balance=1000.00):
         """Create a new wallet for a user"""
         wallet, created = Wallet.objects.get_or_create(
             user=user,
-            defaults={'balance': Decimal(str(initial_balance))}
+            defaults={
+                'balance': Decimal(str(initial_balance)),
+                'total_deposited': Decimal(str(initial_balance)),
+                'transaction_count': 1,
+            }
         )
         if created:
             Transaction.objects.create(
@@ -165,7 +298,8 @@ class WalletManager:
                 transaction_type=Transaction.CREDIT,
                 amount=Decimal(str(initial_balance)),
                 balance_after=wallet.balance,
-                description="Initial deposit"
+                description="Initial deposit",
+                category=Transaction.DEPOSIT
             )
         return wallet, created
     
@@ -176,15 +310,18 @@ class WalletManager:
         Returns: (success: bool, message: str, transaction: Transaction or None)
         """
         try:
-            wallet = Wallet.objects.select_for_update().get(user=user)
-            
-            if not wallet.is_active:
-                return False, "Wallet is not active", None
-            
-            if not wallet.has_sufficient_balance(bet_amount):
-                return False, f"Insufficient balance. Available: {wallet.balance}", None
-            
-            transaction = wallet.deduct(bet_amount, f"Bet placed - {bet_amount}")
+            with db_transaction.atomic():
+                # FOR NO KEY UPDATE: only balance changes, so don't block
+                # inserts of transactions referencing this wallet
+                wallet = Wallet.objects.select_for_update(of=('self',), no_key=True).get(user=user)
+                
+                if not wallet.is_active:
+                    return False, "Wallet is not active", None
+                
+                if not wallet.has_sufficient_balance(bet_amount):
+                    return False, f"Insufficient balance. Available: {wallet.balance}", None
+                
+                transaction = wallet.deduct(bet_amount, f"Bet placed - {bet_amount}", Transaction.BET_PLACED)
             return True, "Bet placed successfully", transaction
             
         except Wallet.DoesNotExist:
@@ -199,16 +336,17 @@ class WalletManager:
         Returns: (success: bool, message: str, transaction: Transaction or None)
         """
         try:
-            wallet = Wallet.objects.select_for_update().get(user=user)
-            
-            if not wallet.is_active:
-                return False, "Wallet is not active", None
-            
-            description = f"Bet winning - {winning_amount}"
-            if bet_id:
-                description += f" (Bet #{bet_id})"
-            
-            transaction = wallet.credit(winning_amount, description)
+            with db_transaction.atomic():
+                wallet = Wallet.objects.select_for_update(of=('self',), no_key=True).get(user=user)
+                
+                if not wallet.is_active:
+                    return False, "Wallet is not active", None
+                
+                description = f"Bet winning - {winning_amount}"
+                if bet_id:
+                    description += f" (Bet #{bet_id})"
+                
+                transaction = wallet.credit(winning_amount, description, Transaction.BET_WON)
             return True, "Winnings credited successfully", transaction
             
         except Wallet.DoesNotExist:
@@ -217,25 +355,114 @@ class WalletManager:
             return False, str(e), None
     
     @staticmethod
-    def get_wallet_summary(user):
+    def process_bet_winnings_bulk(payouts, batch_size=500, category=Transaction.BET_WON,
+                                  description="Bet winning"):
+        """
+        Credit many bet payouts at once (admin mass settlement)
+        payouts: iterable of (user_id, amount, bet_id)
+        category: Transaction category, BET_WON by default; only wins bump the win counters
+        Returns: list of bet ids actually credited
+        Inactive or missing wallets are skipped, like process_bet_winning
+        """
+        payouts = [(user_id, Decimal(str(amount)), bet_id) for user_id, amount, bet_id in payouts]
+        is_win = category == Transaction.BET_WON
+        credited = []
+        
+        with db_transaction.atomic():
+            # Lock every wallet up front in primary-key order, so concurrent
+            # settlements always take the locks in the same order
+            wallets = {
+                wallet.user_id: wallet
+                for wallet in Wallet.objects.select_for_update(of=('self',), no_key=True).filter(
+                    user_id__in={user_id for user_id, _, _ in payouts},
+                    is_active=True
+                ).order_by('pk')
+            }
+            if not wallets:
+                return credited
+            now = timezone.now()
+            
+            # Explicit slices: at most batch_size unsaved Transactions in memory at a time
+            remaining = iter(payouts)
+            while True:
+                batch = list(islice(remaining, batch_size))
+                if not batch:
+                    break
+                
+                # Running balance per wallet so each record gets the right balance_after
+                transactions = []
+                for user_id, amount, bet_id in batch:
+                    wallet = wallets.get(user_id)
+                    if wallet is None:
+                        continue
+                    wallet.balance += amount
+                    wallet.total_deposited += amount
+                    if is_win:
+                        wallet.total_winnings += amount
+                        wallet.total_wins += 1
+                    wallet.transaction_count += 1
+                    wallet.updated_at = now
+                    transactions.append(Transaction(
+                        wallet=wallet,
+                        transaction_type=Transaction.CREDIT,
+                        amount=amount,
+                        balance_after=wallet.balance,
+                        description=f"{description} - {amount} (Bet #{bet_id})",
+                        category=category
+                    ))
+                    credited.append(bet_id)
+                Transaction.objects.bulk_create(transactions)
+            
+            Wallet.objects.bulk_update(
+                wallets.values(),
+                ['balance', 'total_deposited', 'total_winnings', 'total_wins',
+                 'transaction_count', 'updated_at'],
+                batch_size=batch_size
+            )
+            db_transaction.on_commit(lambda: Wallet.invalidate_cache(*wallets))
+        return credited
+    
+    @staticmethod
+    def get_wallet_summary(user, using=None):
         """
         Get comprehensive wallet summary
+        using: database alias to read from (e.g. the read replica)
         Returns: dict with wallet statistics
         """
         try:
-            wallet = Wallet.objects.get(user=user)
-            return {
-                'balance': wallet.balance,
-                'currency': wallet.currency,
-                'total_deposited': wallet.get_total_deposited(),
-                'total_withdrawn': wallet.get_total_withdrawn(),
-                'is_active': wallet.is_active,
-                'created_at': wallet.created_at,
-                'transaction_count': wallet.transactions.count(),
-            }
+            # Straight column read; no aggregation over the ledger
+            return Wallet.objects.db_manager(using).values(
+                *WalletManager.SUMMARY_FIELDS
+            ).get(user=user)
         except Wallet.DoesNotExist:
             return None
     
+    @staticmethod
+    def get_betting_stats(wallet, using=None):
+        """
+        Bet count, win count, total winnings and win rate
+        Read from the wallet's counter columns by primary key; no ledger scan
+        using: database alias to read from; defaults to the router's choice for the wallet
+        Returns: dict with betting statistics
+        """
+        using = using or router.db_for_read(Wallet, instance=wallet)
+        totals = Wallet.objects.using(using).values(
+            'total_bets', 'total_wins', 'total_winnings'
+        ).get(pk=wallet.pk)
+        return WalletManager.betting_stats_from(totals)
+    
+    @staticmethod
+    def betting_stats_from(totals):
+        """Betting stats dict from a row carrying the counter columns"""
+        total_bets = totals['total_bets']
+        total_wins = totals['total_wins']
+        return {
+            'total_bets': total_bets,
+            'total_wins': total_wins,
+            'total_winnings': totals['total_winnings'],
+            'win_rate': (total_wins / total_bets * 100) if total_bets > 0 else 0,
+        }
+    
     @staticmethod
     def get_transaction_history(user, limit=50):
         """Get user's transaction history"""
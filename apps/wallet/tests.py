@@ -1,98 +1,128 @@
-from django.test import TestCase, Client
-from django.contrib.auth.models import User
+import pytest
 from decimal import Decimal
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from apps.wallet.management.commands.backfill_wallet_totals import TOTAL_FIELDS
 from .models import Wallet, Transaction, WalletManager
 
 
-class WalletModelTest(TestCase):
+@pytest.mark.django_db
+class TestWalletModel:
     """Test cases for Wallet model"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        self.wallet = Wallet.objects.create(
-            user=self.user,
-            balance=Decimal('1000.00')
-        )
-    
-    def test_wallet_creation(self):
+    def test_wallet_creation(self, user, wallet):
         """Test wallet is created correctly"""
-        self.assertEqual(self.wallet.user, self.user)
-        self.assertEqual(self.wallet.balance, Decimal('1000.00'))
-        self.assertEqual(self.wallet.currency, 'USD')
-        self.assertTrue(self.wallet.is_active)
+        assert wallet.user == user
+        assert wallet.balance == Decimal('1000.00')
+        assert wallet.currency == 'USD'
+        assert wallet.is_active
     
-    def test_has_sufficient_balance(self):
+    def test_has_sufficient_balance(self, wallet):
         """Test balance checking"""
-        self.assertTrue(self.wallet.has_sufficient_balance(500))
-        self.assertTrue(self.wallet.has_sufficient_balance(1000))
-        self.assertFalse(self.wallet.has_sufficient_balance(1500))
+        assert wallet.has_sufficient_balance(500)
+        assert wallet.has_sufficient_balance(1000)
+        assert not wallet.has_sufficient_balance(1500)
     
-    def test_wallet_deduct(self):
+    def test_wallet_deduct(self, wallet):
         """Test deducting from wallet"""
-        initial_balance = self.wallet.balance
+        initial_balance = wallet.balance
         amount = Decimal('200.00')
         
-        transaction = self.wallet.deduct(amount, "Test deduction")
+        transaction = wallet.deduct(amount, "Test deduction")
         
-        self.wallet.refresh_from_db()
-        self.assertEqual(self.wallet.balance, initial_balance - amount)
-        self.assertEqual(transaction.transaction_type, Transaction.DEBIT)
-        self.assertEqual(transaction.amount, amount)
+        wallet.refresh_from_db()
+        assert wallet.balance == initial_balance - amount
+        assert transaction.transaction_type == Transaction.DEBIT
+        assert transaction.amount == amount
     
-    def test_wallet_credit(self):
+    def test_wallet_credit(self, wallet):
         """Test crediting to wallet"""
-        initial_balance = self.wallet.balance
+        initial_balance = wallet.balance
         amount = Decimal('500.00')
         
-        transaction = self.wallet.credit(amount, "Test credit")
+        transaction = wallet.credit(amount, "Test credit")
         
-        self.wallet.refresh_from_db()
-        self.assertEqual(self.wallet.balance, initial_balance + amount)
-        self.assertEqual(transaction.transaction_type, Transaction.CREDIT)
-        self.assertEqual(transaction.amount, amount)
+        wallet.refresh_from_db()
+        assert wallet.balance == initial_balance + amount
+        assert transaction.transaction_type == Transaction.CREDIT
+        assert transaction.amount == amount
     
-    def test_insufficient_balance_raises_error(self):
+    def test_stale_instances_do_not_lose_updates(self, wallet):
+        """Test credit()/deduct() on stale copies both land, with no row lock held"""
+        first = Wallet.objects.get(pk=wallet.pk)
+        second = Wallet.objects.get(pk=wallet.pk)
+        
+        first.credit(Decimal('100.00'))
+        second.deduct(Decimal('30.00'))
+        
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal('1070.00')
+        assert second.balance == Decimal('1070.00')
+    
+    def test_stale_instance_cannot_overdraw(self, wallet):
+        """Test the balance check uses the row's current balance, not the instance's"""
+        stale = Wallet.objects.get(pk=wallet.pk)
+        wallet.deduct(Decimal('900.00'))
+        
+        with pytest.raises(ValueError):
+            stale.deduct(Decimal('200.00'))
+        
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal('100.00')
+    
+    def test_cache_dropped_on_commit(self, user, wallet, django_capture_on_commit_callbacks):
+        """Test the cached balance survives until the credit commits"""
+        key = Wallet.BALANCE_CACHE_KEY.format(user.id)
+        cache.set(key, 'stale')
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet.credit(Decimal('10.00'), "Test credit")
+            assert cache.get(key) == 'stale'
+        
+        assert cache.get(key) is None
+    
+    def test_insufficient_balance_raises_error(self, wallet):
         """Test that deducting more than balance raises error"""
-        with self.assertRaises(ValueError):
-            self.wallet.deduct(Decimal('2000.00'))
+        with pytest.raises(ValueError):
+            wallet.deduct(Decimal('2000.00'))
+    
+    def test_credit_and_deduct_user(self, user, wallet):
+        """Test user-level credit/deduct return the new balance"""
+        transaction, balance = Wallet.credit_user(user, Decimal('100.00'))
+        assert balance == Decimal('1100.00')
+        assert transaction.balance_after == Decimal('1100.00')
+        
+        transaction, balance = Wallet.deduct_user(user, Decimal('300.00'))
+        assert balance == Decimal('800.00')
+        
+        with pytest.raises(ValueError):
+            Wallet.deduct_user(user, Decimal('5000.00'))
 
 
-class TransactionModelTest(TestCase):
+@pytest.mark.django_db
+class TestTransactionModel:
     """Test cases for Transaction model"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        self.wallet = Wallet.objects.create(
-            user=self.user,
-            balance=Decimal('1000.00')
-        )
-    
-    def test_transaction_creation(self):
+    def test_transaction_creation(self, wallet):
         """Test transaction is created correctly"""
         transaction = Transaction.objects.create(
-            wallet=self.wallet,
+            wallet=wallet,
             transaction_type=Transaction.CREDIT,
             amount=Decimal('100.00'),
             balance_after=Decimal('1100.00'),
             description="Test transaction"
         )
         
-        self.assertEqual(transaction.wallet, self.wallet)
-        self.assertEqual(transaction.amount, Decimal('100.00'))
-        self.assertEqual(transaction.status, Transaction.COMPLETED)
+        assert transaction.wallet == wallet
+        assert transaction.amount == Decimal('100.00')
+        assert transaction.status == Transaction.COMPLETED
     
-    def test_transaction_icon(self):
+    def test_transaction_icon(self, wallet):
         """Test transaction icon display"""
         credit_trans = Transaction.objects.create(
-            wallet=self.wallet,
+            wallet=wallet,
             transaction_type=Transaction.CREDIT,
             amount=Decimal('100.00'),
             balance_after=Decimal('1100.00'),
@@ -100,128 +130,220 @@ class TransactionModelTest(TestCase):
         )
         
         debit_trans = Transaction.objects.create(
-            wallet=self.wallet,
+            wallet=wallet,
             transaction_type=Transaction.DEBIT,
             amount=Decimal('50.00'),
             balance_after=Decimal('950.00'),
             description="Debit"
         )
         
-        self.assertEqual(credit_trans.get_transaction_icon(), '↑')
-        self.assertEqual(debit_trans.get_transaction_icon(), '↓')
+        assert credit_trans.get_transaction_icon() == '↑'
+        assert debit_trans.get_transaction_icon() == '↓'
 
 
-class WalletManagerTest(TestCase):
+@pytest.mark.django_db
+class TestWalletManager:
     """Test cases for WalletManager"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-    
-    def test_create_wallet_for_user(self):
+    def test_create_wallet_for_user(self, user):
         """Test creating wallet for user"""
-        wallet, created = WalletManager.create_wallet_for_user(self.user, 2000)
+        wallet, created = WalletManager.create_wallet_for_user(user, 2000)
         
-        self.assertTrue(created)
-        self.assertEqual(wallet.user, self.user)
-        self.assertEqual(wallet.balance, Decimal('2000.00'))
+        assert created
+        assert wallet.user == user
+        assert wallet.balance == Decimal('2000.00')
         
         # Test that calling again doesn't create duplicate
-        wallet2, created2 = WalletManager.create_wallet_for_user(self.user)
-        self.assertFalse(created2)
-        self.assertEqual(wallet.id, wallet2.id)
+        wallet2, created2 = WalletManager.create_wallet_for_user(user)
+        assert not created2
+        assert wallet.id == wallet2.id
     
-    def test_process_bet_placement(self):
+    def test_process_bet_placement(self, user):
         """Test bet placement processing"""
-        WalletManager.create_wallet_for_user(self.user, 1000)
+        WalletManager.create_wallet_for_user(user, 1000)
         
         success, message, transaction = WalletManager.process_bet_placement(
-            self.user, 
+            user, 
             Decimal('200.00')
         )
         
-        self.assertTrue(success)
-        self.assertIsNotNone(transaction)
+        assert success
+        assert transaction is not None
         
-        wallet = Wallet.objects.get(user=self.user)
-        self.assertEqual(wallet.balance, Decimal('800.00'))
+        wallet = Wallet.objects.get(user=user)
+        assert wallet.balance == Decimal('800.00')
     
-    def test_process_bet_placement_insufficient_funds(self):
+    def test_process_bet_placement_insufficient_funds(self, user):
         """Test bet placement with insufficient funds"""
-        WalletManager.create_wallet_for_user(self.user, 100)
+        WalletManager.create_wallet_for_user(user, 100)
         
         success, message, transaction = WalletManager.process_bet_placement(
-            self.user, 
+            user, 
             Decimal('200.00')
         )
         
-        self.assertFalse(success)
-        self.assertIsNone(transaction)
-        self.assertIn("Insufficient balance", message)
+        assert not success
+        assert transaction is None
+        assert "Insufficient balance" in message
     
-    def test_process_bet_winning(self):
+    def test_process_bet_winning(self, user):
         """Test processing bet winnings"""
-        WalletManager.create_wallet_for_user(self.user, 1000)
+        WalletManager.create_wallet_for_user(user, 1000)
         
         success, message, transaction = WalletManager.process_bet_winning(
-            self.user,
+            user,
             Decimal('500.00'),
             bet_id=123
         )
         
-        self.assertTrue(success)
-        self.assertIsNotNone(transaction)
+        assert success
+        assert transaction is not None
         
-        wallet = Wallet.objects.get(user=self.user)
-        self.assertEqual(wallet.balance, Decimal('1500.00'))
+        wallet = Wallet.objects.get(user=user)
+        assert wallet.balance == Decimal('1500.00')
     
-    def test_get_wallet_summary(self):
+    def test_process_bet_winnings_bulk(self, user):
+        """Test crediting several payouts in one batch"""
+        WalletManager.create_wallet_for_user(user, 1000)
+        
+        credited = WalletManager.process_bet_winnings_bulk([
+            (user.id, Decimal('100.00'), 1),
+            (user.id, Decimal('50.00'), 2),
+        ], batch_size=1)
+        
+        assert credited == [1, 2]
+        last = Transaction.objects.filter(category=Transaction.BET_WON).order_by('-id').first()
+        assert last.balance_after == Decimal('1150.00')
+        
+        wallet = Wallet.objects.get(user=user)
+        assert wallet.balance == Decimal('1150.00')
+        assert wallet.total_wins == 2
+    
+    def test_process_bet_winnings_bulk_skips_inactive_wallet(self, user):
+        """Test payouts to an inactive wallet are not reported as credited"""
+        WalletManager.create_wallet_for_user(user, 1000)
+        Wallet.objects.filter(user=user).update(is_active=False)
+        
+        credited = WalletManager.process_bet_winnings_bulk([(user.id, Decimal('100.00'), 1)])
+        
+        assert credited == []
+        assert Wallet.objects.get(user=user).balance == Decimal('1000.00')
+    
+    def test_process_bet_winnings_bulk_refund(self, user):
+        """Test bulk refunds are booked as refunds and don't count as wins"""
+        WalletManager.create_wallet_for_user(user, 1000)
+        
+        WalletManager.process_bet_winnings_bulk(
+            [(user.id, Decimal('25.00'), 3)],
+            category=Transaction.REFUND, description="Bet refund"
+        )
+        
+        refund = Transaction.objects.get(category=Transaction.REFUND)
+        assert refund.description == "Bet refund - 25.00 (Bet #3)"
+        wallet = Wallet.objects.get(user=user)
+        assert wallet.balance == Decimal('1025.00')
+        assert wallet.total_wins == 0
+        assert wallet.total_winnings == Decimal('0.00')
+    
+    def test_get_betting_stats(self, user):
+        """Test betting stats come from the wallet's transactions"""
+        wallet, _ = WalletManager.create_wallet_for_user(user, 1000)
+        WalletManager.process_bet_placement(user, Decimal('100.00'))
+        WalletManager.process_bet_placement(user, Decimal('50.00'))
+        WalletManager.process_bet_winning(user, Decimal('200.00'), bet_id=1)
+        
+        stats = WalletManager.get_betting_stats(wallet)
+        
+        assert stats['total_bets'] == 2
+        assert stats['total_wins'] == 1
+        assert stats['total_winnings'] == Decimal('200.00')
+        assert stats['win_rate'] == 50
+    
+    def test_get_wallet_summary(self, user):
         """Test wallet summary generation"""
-        WalletManager.create_wallet_for_user(self.user, 1000)
+        WalletManager.create_wallet_for_user(user, 1000)
+        
+        summary = WalletManager.get_wallet_summary(user)
+        
+        assert summary is not None
+        assert summary['balance'] == Decimal('1000.00')
+        assert summary['currency'] == 'USD'
+        assert summary['is_active']
+    
+    def test_wallet_summary_tracks_running_totals(self, user):
+        """Test credit/deduct keep the summary columns in step with the ledger"""
+        WalletManager.create_wallet_for_user(user, 1000)
+        WalletManager.process_bet_placement(user, Decimal('100.00'))
+        WalletManager.process_bet_winning(user, Decimal('250.00'), bet_id=1)
         
-        summary = WalletManager.get_wallet_summary(self.user)
+        summary = WalletManager.get_wallet_summary(user)
+        totals = Wallet.objects.get(user=user).get_ledger_totals()
         
-        self.assertIsNotNone(summary)
-        self.assertEqual(summary['balance'], Decimal('1000.00'))
-        self.assertEqual(summary['currency'], 'USD')
-        self.assertTrue(summary['is_active'])
+        assert summary['total_deposited'] == totals['deposited']
+        assert summary['total_withdrawn'] == totals['withdrawn']
+        assert summary['transaction_count'] == totals['count']
+        assert summary['total_winnings'] == Decimal('250.00')
 
 
-class WalletViewTest(TestCase):
+@pytest.mark.django_db(databases=['default', 'replica'], transaction=True)
+class TestWalletViews:
     """Test cases for Wallet views"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.client = Client()
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        self.wallet = Wallet.objects.create(
-            user=self.user,
-            balance=Decimal('1000.00')
-        )
-    
-    def test_wallet_dashboard_requires_login(self):
+    def test_wallet_dashboard_requires_login(self, client, wallet):
         """Test that wallet dashboard requires authentication"""
-        response = self.client.get('/wallet/')
-        self.assertEqual(response.status_code, 302)  # Redirect to login
+        response = client.get('/wallet/')
+        assert response.status_code == 302  # Redirect to login
     
-    def test_wallet_dashboard_authenticated(self):
+    def test_wallet_dashboard_authenticated(self, client, user, wallet):
         """Test wallet dashboard for authenticated user"""
-        self.client.login(username='testuser', password='testpass123')
-        response = self.client.get('/wallet/')
-        self.assertEqual(response.status_code, 200)
+        client.force_login(user)
+        response = client.get('/wallet/')
+        assert response.status_code == 200
     
-    def test_wallet_balance_api(self):
+    def test_wallet_balance_api(self, client, user, wallet):
         """Test wallet balance API endpoint"""
-        self.client.login(username='testuser', password='testpass123')
-        response = self.client.get('/wallet/api/balance/')
+        client.force_login(user)
+        response = client.get('/wallet/api/balance/')
         
-        self.assertEqual(response.status_code, 200)
+        assert response.status_code == 200
         data = response.json()
-        self.assertTrue(data['success'])
-        self.assertEqual(data['balance'], 1000.00)
\ No newline at end of file
+        assert data['success']
+        assert data['balance'] == 1000.00
+
+
+@pytest.mark.django_db
+class TestSeedWalletDemo:
+    """Test cases for the seed_wallet_demo command"""
+    
+    def test_seeds_wallet_activity(self, user):
+        """Test the demo flow lands in the user's wallet"""
+        call_command('seed_wallet_demo', email=user.email, stdout=StringIO())
+        
+        wallet = Wallet.objects.get(user=user)
+        assert wallet.balance == Decimal('1075.00')
+        assert wallet.transactions.count() == 5
+    
+    def test_unknown_user(self, db):
+        """Test a missing user is reported, not created"""
+        with pytest.raises(CommandError):
+            call_command('seed_wallet_demo', email='nobody@example.com')
+
+
+@pytest.mark.django_db
+class TestBackfillWalletTotals:
+    """Test cases for the backfill_wallet_totals command"""
+    
+    def test_recomputes_totals_from_ledger(self, user):
+        """Test zeroed totals are rebuilt from the transactions"""
+        WalletManager.create_wallet_for_user(user, 1000)
+        WalletManager.process_bet_placement(user, Decimal('100.00'))
+        WalletManager.process_bet_winning(user, Decimal('250.00'), bet_id=1)
+        expected = Wallet.objects.values(*TOTAL_FIELDS).get(user=user)
+        Wallet.objects.filter(user=user).update(
+            total_deposited=0, total_withdrawn=0, transaction_count=0,
+            total_bets=0, total_wins=0, total_winnings=0
+        )
+        
+        call_command('backfill_wallet_totals', stdout=StringIO())
+        
+        assert Wallet.objects.values(*TOTAL_FIELDS).get(user=user) == expected
@@ -0,0 +1,24 @@
+from django.http import HttpResponse
+from decimal import Decimal
+import orjson
+
+
+def _json_default(obj):
+    """orjson hook for types it doesn't serialize natively"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError
+
+
+def dump_json(data):
+    """Serialize to JSON bytes with orjson"""
+    return orjson.dumps(data, default=_json_default)
+
+
+def fast_json(data, status=200):
+    """
+    JsonResponse equivalent for the polled endpoints
+    data may be a dict or bytes already produced by dump_json()
+    """
+    body = data if isinstance(data, bytes) else dump_json(data)
+    return HttpResponse(body, status=status, content_type='application/json')
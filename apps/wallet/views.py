@@ -1,11 +1,20 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
-from django.db import transaction
+from django.core.cache import cache
+from django.core.paginator import Paginator
 from decimal import Decimal
+from .forms import DepositForm, FundsForm
 from .models import Wallet, Transaction, WalletManager
+from .utils import dump_json, fast_json
+
+# Read-only polling endpoints go to the replica; writes stay on 'default'
+READ_DB = 'replica'
+
+# Same mapping as Transaction.get_transaction_icon()/get_transaction_class()
+TRANSACTION_ICONS = {Transaction.CREDIT: '↑', Transaction.DEBIT: '↓'}
+TRANSACTION_CLASSES = {Transaction.CREDIT: 'credit', Transaction.DEBIT: 'debit'}
 
 
 @login_required
@@ -13,49 +22,27 @@ def wallet_dashboard(request):
     """
     Main wallet dashboard view - connects to your interactive interface
     """
-    # Get or create wallet for the user
-    wallet, created = WalletManager.create_wallet_for_user(request.user)
+    # Summary columns and bet counters all live on the wallet row
+    wallet = Wallet.objects.filter(user=request.user).first()
+    if wallet is None:
+        # First visit: create the wallet
+        wallet, _ = WalletManager.create_wallet_for_user(request.user)
     
-    # Get wallet summary
-    summary = WalletManager.get_wallet_summary(request.user)
+    # Summary values are plain columns on the wallet now
+    summary = {field: getattr(wallet, field) for field in WalletManager.SUMMARY_FIELDS}
     
     # Get recent transactions (last 10)
-    recent_transactions = WalletManager.get_transaction_history(request.user, limit=10)
-    
-    # Calculate statistics for the dashboard
-    total_bets = Transaction.objects.filter(
-        wallet=wallet,
-        transaction_type=Transaction.DEBIT,
-        description__icontains='bet'
-    ).count()
-    
-    active_bets_count = 3  # You'll replace this with actual logic from bets app
-    
-    # Calculate win rate
-    total_wins = Transaction.objects.filter(
-        wallet=wallet,
-        transaction_type=Transaction.CREDIT,
-        description__icontains='winning'
-    ).count()
+    recent_transactions = wallet.transactions.all()[:10]
     
-    win_rate = (total_wins / total_bets * 100) if total_bets > 0 else 0
-    
-    # Calculate total winnings
-    total_winnings = Transaction.objects.filter(
-        wallet=wallet,
-        transaction_type=Transaction.CREDIT,
-        description__icontains='winning',
-        status=Transaction.COMPLETED
-    ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
+    win_rate = (wallet.total_wins / wallet.total_bets * 100) if wallet.total_bets > 0 else 0
     
     context = {
         'wallet': wallet,
         'summary': summary,
         'transactions': recent_transactions,
-        'total_bets': total_bets,
-        'active_bets_count': active_bets_count,
+        'total_bets': wallet.total_bets,
         'win_rate': round(win_rate, 1),
-        'total_winnings': total_winnings,
+        'total_winnings': wallet.total_winnings,
     }
     
     return render(request, 'wallet/dashboard.html', context)
@@ -72,8 +59,8 @@ def transaction_history(request):
     transaction_type = request.GET.get('type', '')
     status = request.GET.get('status', '')
     
-    # Get all transactions
-    transactions = wallet.transactions.all()
+    # Get all transactions (wallet and user joined in for per-row display)
+    transactions = wallet.transactions.select_related('wallet__user').order_by('-created_at')
     
     # Apply filters
     if transaction_type:
@@ -81,9 +68,12 @@ def transaction_history(request):
     if status:
         transactions = transactions.filter(status=status)
     
+    page_obj = Paginator(transactions, 50).get_page(request.GET.get('page'))
+    
     context = {
         'wallet': wallet,
-        'transactions': transactions,
+        'transactions': page_obj,
+        'page_obj': page_obj,
         'transaction_type': transaction_type,
         'status': status,
     }
@@ -97,47 +87,34 @@ def add_funds(request):
     """
     Add funds to wallet - connects to the Add Funds modal
     """
+    form = DepositForm(request.POST)
+    if not form.is_valid():
+        return _invalid_amount_response(form)
+    amount = form.cleaned_data['amount']
+    
     try:
-        amount = Decimal(request.POST.get('amount', '0'))
-        
-        # Validation
-        if amount <= 0:
-            return JsonResponse({
-                'success': False,
-                'error': 'Amount must be greater than zero'
-            }, status=400)
-        
-        if amount > 10000:
-            return JsonResponse({
-                'success': False,
-                'error': 'Maximum deposit amount is $10,000'
-            }, status=400)
-        
-        # Get wallet
-        wallet = get_object_or_404(Wallet, user=request.user)
-        
-        # Add funds using atomic transaction
-        with transaction.atomic():
-            trans = wallet.credit(amount, f"Deposit - Added ${amount}")
-        
-        # Return success response with updated data
-        return JsonResponse({
-            'success': True,
-            'message': f'Successfully added ${amount} to your wallet',
-            'new_balance': float(wallet.balance),
-            'transaction': {
-                'id': trans.id,
-                'amount': float(trans.amount),
-                'description': trans.description,
-                'created_at': trans.created_at.strftime('%b %d, %Y - %H:%M'),
-            }
-        })
-        
-    except Exception as e:
+        # Single UPDATE on the user's wallet; no separate wallet fetch
+        trans, new_balance = Wallet.credit_user(
+            request.user, amount, f"Deposit - Added ${amount}", Transaction.DEPOSIT
+        )
+    except Wallet.DoesNotExist:
         return JsonResponse({
             'success': False,
-            'error': str(e)
-        }, status=500)
+            'error': 'Wallet not found'
+        }, status=404)
+    
+    # Return success response with updated data
+    return JsonResponse({
+        'success': True,
+        'message': f'Successfully added ${amount} to your wallet',
+        'new_balance': float(new_balance),
+        'transaction': {
+            'id': trans.id,
+            'amount': float(trans.amount),
+            'description': trans.description,
+            'created_at': trans.created_at.strftime('%b %d, %Y - %H:%M'),
+        }
+    })
 
 
 @login_required
@@ -146,52 +123,48 @@ def withdraw_funds(request):
     """
     Withdraw funds from wallet - connects to the Withdraw modal
     """
+    form = FundsForm(request.POST)
+    if not form.is_valid():
+        return _invalid_amount_response(form)
+    amount = form.cleaned_data['amount']
+    
     try:
-        amount = Decimal(request.POST.get('amount', '0'))
-        
-        # Get wallet
-        wallet = get_object_or_404(Wallet, user=request.user)
-        
-        # Validation
-        if amount <= 0:
-            return JsonResponse({
-                'success': False,
-                'error': 'Amount must be greater than zero'
-            }, status=400)
-        
-        if not wallet.has_sufficient_balance(amount):
-            return JsonResponse({
-                'success': False,
-                'error': f'Insufficient balance. Available: ${wallet.balance}'
-            }, status=400)
-        
-        # Withdraw funds using atomic transaction
-        with transaction.atomic():
-            trans = wallet.deduct(amount, f"Withdrawal - ${amount}")
-        
-        # Return success response
+        # Conditional UPDATE; an overdraw raises ValueError
+        trans, new_balance = Wallet.deduct_user(
+            request.user, amount, f"Withdrawal - ${amount}", Transaction.WITHDRAWAL
+        )
+    except Wallet.DoesNotExist:
         return JsonResponse({
-            'success': True,
-            'message': f'Successfully withdrew ${amount} from your wallet',
-            'new_balance': float(wallet.balance),
-            'transaction': {
-                'id': trans.id,
-                'amount': float(trans.amount),
-                'description': trans.description,
-                'created_at': trans.created_at.strftime('%b %d, %Y - %H:%M'),
-            }
-        })
-        
+            'success': False,
+            'error': 'Wallet not found'
+        }, status=404)
     except ValueError as e:
         return JsonResponse({
             'success': False,
             'error': str(e)
         }, status=400)
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        }, status=500)
+    
+    # Return success response
+    return JsonResponse({
+        'success': True,
+        'message': f'Successfully withdrew ${amount} from your wallet',
+        'new_balance': float(new_balance),
+        'transaction': {
+            'id': trans.id,
+            'amount': float(trans.amount),
+            'description': trans.description,
+            'created_at': trans.created_at.strftime('%b %d, %Y - %H:%M'),
+        }
+    })
+
+
+def _invalid_amount_response(form):
+    """400 response for a funds form that failed validation"""
+    return JsonResponse({
+        'success': False,
+        'error': form.errors['amount'][0],
+        'errors': form.errors,
+    }, status=400)
 
 
 @login_required
@@ -200,24 +173,33 @@ def wallet_balance_api(request):
     API endpoint to get current wallet balance
     Used for real-time balance updates in the interface
     """
-    try:
-        wallet = Wallet.objects.get(user=request.user)
-        summary = WalletManager.get_wallet_summary(request.user)
-        
-        return JsonResponse({
-            'success': True,
-            'balance': float(wallet.balance),
-            'currency': wallet.currency,
-            'is_active': wallet.is_active,
-            'total_deposited': float(summary['total_deposited']),
-            'total_withdrawn': float(summary['total_withdrawn']),
-            'transaction_count': summary['transaction_count'],
-        })
-    except Wallet.DoesNotExist:
-        return JsonResponse({
+    # Polled by the UI; credit()/deduct() drop the key when the balance moves
+    # The cache holds the serialized body, so a hit does no JSON work at all
+    key = Wallet.BALANCE_CACHE_KEY.format(request.user.id)
+    body = cache.get(key)
+    if body is not None:
+        return fast_json(body)
+    
+    # The summary already carries balance/currency/is_active: one narrow SELECT
+    summary = WalletManager.get_wallet_summary(request.user, using=READ_DB)
+    if summary is None:
+        return fast_json({
             'success': False,
             'error': 'Wallet not found'
         }, status=404)
+    
+    payload = {
+        'success': True,
+        'balance': float(summary['balance']),
+        'currency': summary['currency'],
+        'is_active': summary['is_active'],
+        'total_deposited': float(summary['total_deposited']),
+        'total_withdrawn': float(summary['total_withdrawn']),
+        'transaction_count': summary['transaction_count'],
+    }
+    body = dump_json(payload)
+    cache.set(key, body, Wallet.API_CACHE_TIMEOUT)
+    return fast_json(body)
 
 
 @login_required
@@ -228,11 +210,11 @@ def check_balance(request):
     """
     try:
         amount = Decimal(request.GET.get('amount', '0'))
-        wallet = Wallet.objects.get(user=request.user)
+        wallet = Wallet.objects.using(READ_DB).only('balance').get(user=request.user)
         
         has_balance = wallet.has_sufficient_balance(amount)
         
-        return JsonResponse({
+        return fast_json({
             'success': True,
             'has_sufficient_balance': has_balance,
             'current_balance': float(wallet.balance),
@@ -240,12 +222,12 @@ def check_balance(request):
             'message': 'Sufficient balance' if has_balance else 'Insufficient balance'
         })
     except Wallet.DoesNotExist:
-        return JsonResponse({
+        return fast_json({
             'success': False,
             'error': 'Wallet not found'
         }, status=404)
     except Exception as e:
-        return JsonResponse({
+        return fast_json({
             'success': False,
             'error': str(e)
         }, status=400)
@@ -256,49 +238,38 @@ def get_wallet_stats(request):
     """
     Get comprehensive wallet statistics for the dashboard
     """
+    key = Wallet.STATS_CACHE_KEY.format(request.user.id)
+    body = cache.get(key)
+    if body is not None:
+        return fast_json(body)
+    
     try:
-        wallet = Wallet.objects.get(user=request.user)
-        summary = WalletManager.get_wallet_summary(request.user)
-        
-        # Calculate total winnings
-        total_winnings = Transaction.objects.filter(
-            wallet=wallet,
-            transaction_type=Transaction.CREDIT,
-            description__icontains='winning',
-            status=Transaction.COMPLETED
-        ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
+        # Balance, totals and bet counters are all columns: one narrow SELECT
+        wallet = Wallet.objects.using(READ_DB).values(
+            'balance', 'total_deposited', 'total_withdrawn', 'total_winnings',
+            'total_bets', 'total_wins', 'created_at'
+        ).get(user=request.user)
         
-        # Calculate total bets
-        total_bets = Transaction.objects.filter(
-            wallet=wallet,
-            transaction_type=Transaction.DEBIT,
-            description__icontains='bet'
-        ).count()
+        bet_stats = WalletManager.betting_stats_from(wallet)
         
-        # Calculate wins
-        total_wins = Transaction.objects.filter(
-            wallet=wallet,
-            transaction_type=Transaction.CREDIT,
-            description__icontains='winning'
-        ).count()
-        
-        win_rate = (total_wins / total_bets * 100) if total_bets > 0 else 0
-        
-        return JsonResponse({
+        payload = {
             'success': True,
             'stats': {
-                'balance': float(wallet.balance),
-                'total_deposited': float(summary['total_deposited']),
-                'total_withdrawn': float(summary['total_withdrawn']),
-                'total_winnings': float(total_winnings),
-                'total_bets': total_bets,
-                'total_wins': total_wins,
-                'win_rate': round(win_rate, 1),
-                'member_since': summary['created_at'].strftime('%b %d, %Y'),
+                'balance': float(wallet['balance']),
+                'total_deposited': float(wallet['total_deposited']),
+                'total_withdrawn': float(wallet['total_withdrawn']),
+                'total_winnings': float(bet_stats['total_winnings']),
+                'total_bets': bet_stats['total_bets'],
+                'total_wins': bet_stats['total_wins'],
+                'win_rate': round(bet_stats['win_rate'], 1),
+                'member_since': wallet['created_at'].strftime('%b %d, %Y'),
             }
-        })
+        }
+        body = dump_json(payload)
+        cache.set(key, body, Wallet.API_CACHE_TIMEOUT)
+        return fast_json(body)
     except Wallet.DoesNotExist:
-        return JsonResponse({
+        return fast_json({
             'success': False,
             'error': 'Wallet not found'
         }, status=404)
@@ -311,28 +282,36 @@ def get_recent_transactions(request):
     """
     try:
         limit = int(request.GET.get('limit', 10))
-        transactions = WalletManager.get_transaction_history(request.user, limit=limit)
+        # Plain dicts straight from the (wallet, -created_at) index; no model instances
+        transactions = Transaction.objects.using(READ_DB).filter(
+            wallet__user=request.user
+        ).order_by('-created_at').values(
+            'id', 'transaction_type', 'amount', 'description',
+            'status', 'balance_after', 'created_at'
+        )[:limit]
         
-        transactions_data = []
-        for trans in transactions:
-            transactions_data.append({
-                'id': trans.id,
-                'type': trans.transaction_type,
-                'amount': float(trans.amount),
-                'description': trans.description,
-                'status': trans.status,
-                'balance_after': float(trans.balance_after),
-                'created_at': trans.created_at.strftime('%b %d, %Y - %H:%M'),
-                'icon': trans.get_transaction_icon(),
-                'css_class': trans.get_transaction_class(),
-            })
+        transactions_data = [
+            {
+                'id': trans['id'],
+                'type': trans['transaction_type'],
+                'amount': float(trans['amount']),
+                'description': trans['description'],
+                'status': trans['status'],
+                'balance_after': float(trans['balance_after']),
+                # Epoch seconds; the client formats with toLocaleString()
+                'created_at': int(trans['created_at'].timestamp()),
+                'icon': TRANSACTION_ICONS[trans['transaction_type']],
+                'css_class': TRANSACTION_CLASSES[trans['transaction_type']],
+            }
+            for trans in transactions
+        ]
         
-        return JsonResponse({
+        return fast_json({
             'success': True,
             'transactions': transactions_data
         })
     except Exception as e:
-        return JsonResponse({
+        return fast_json({
             'success': False,
             'error': str(e)
         }, status=500)
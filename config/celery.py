@@ -0,0 +1,20 @@
+import os
+
+try:
+    from celery import Celery, shared_task
+except ImportError:
+    # Celery is optional for manage.py/WSGI; without it tasks run inline
+    Celery = None
+
+    def shared_task(func):
+        """Stand-in for celery.shared_task: .delay() calls the task directly"""
+        func.delay = func
+        return func
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+app = None
+if Celery is not None:
+    app = Celery('config')
+    app.config_from_object('django.conf:settings', namespace='CELERY')
+    app.autodiscover_tasks()
@@ -0,0 +1,18 @@
+class PrimaryReplicaRouter:
+    """
+    Keep every write and migration on 'default'
+    Reads use 'default' unless a query asks for the replica with .using()
+    """
+    
+    def db_for_read(self, model, **hints):
+        return None
+    
+    def db_for_write(self, model, **hints):
+        return 'default'
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -16,6 +16,7 @@ INSTALLED_APPS = [
     'apps.wallet',
     'apps.events',
     'apps.bets',
+    'wallet',
 ]
 
 MIDDLEWARE = [
@@ -50,9 +51,40 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Reuse connections across requests; check them before reuse
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    # Read replica for the wallet polling endpoints; point NAME/HOST at the
+    # replica in deployment. Tests mirror it onto the default test database.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['config.routers.PrimaryReplicaRouter']
+
+# Celery workers invalidate cached stats/balances after settling bets, so
+# outside development the cache must be shared by web processes and workers
+if DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'cse-bet',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://localhost:6379/1',
+        }
+    }
+
 AUTH_USER_MODEL = 'accounts.CustomUser'
 STATIC_URL = '/static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -60,3 +92,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'login'
+
+# Celery (bet settlement runs outside the request cycle)
+CELERY_BROKER_URL = 'redis://localhost:6379/0'
+CELERY_TASK_SERIALIZER = 'json'
+# No broker in development or tests: run tasks in-process as they are queued
+CELERY_TASK_ALWAYS_EAGER = DEBUG
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BEAT_SCHEDULE = {
+    # Aggregation window for dice game stats; each flush is one write
+    # transaction, so keep it well apart from the bet traffic it batches
+    'flush-game-stats': {
+        'task': 'wallet.tasks.flush_game_stats',
+        'schedule': 10.0,
+    },
+}
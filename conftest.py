@@ -0,0 +1,28 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from apps.wallet.models import Wallet
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached API payloads and stats must not leak between tests"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    """A plain user with no wallet"""
+    return get_user_model().objects.create_user(
+        email='testuser@example.com',
+        password='testpass123'
+    )
+
+
+@pytest.fixture
+def wallet(user):
+    """The user's wallet holding 1000.00"""
+    return Wallet.objects.create(user=user, balance=Decimal('1000.00'))
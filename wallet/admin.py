@@ -1,23 +1,23 @@
 from django.contrib import admin
-
-# Register your models here.
-# wallet/admin.py
-from django.contrib import admin
-from .models import Wallet, Transaction
+from .models import DiceGame, GameStats
 
 
-@admin.register(Wallet)
-class WalletAdmin(admin.ModelAdmin):
-    list_display = ['user', 'balance', 'created_at', 'updated_at']
-    search_fields = ['user__username', 'user__email']
-    readonly_fields = ['created_at', 'updated_at']
-    list_filter = ['created_at']
+@admin.register(DiceGame)
+class DiceGameAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'bet_type', 'bet_amount', 'dice_result', 'status', 'payout_amount', 'created_at']
+    list_filter = ['status', 'bet_type', 'created_at']
+    search_fields = ['user__email']
+    readonly_fields = ['id', 'created_at']
+    date_hierarchy = 'created_at'
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    list_per_page = 50
 
 
-@admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
-    list_display = ['reference_number', 'wallet', 'transaction_type', 'amount', 'status', 'created_at']
-    list_filter = ['transaction_type', 'status', 'created_at']
-    search_fields = ['reference_number', 'wallet__user__username', 'description']
-    readonly_fields = ['id', 'reference_number', 'created_at']
-    date_hierarchy = 'created_at'
\ No newline at end of file
+@admin.register(GameStats)
+class GameStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total_games', 'total_wins', 'total_losses', 'total_wagered', 'total_won']
+    search_fields = ['user__email']
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    list_per_page = 50
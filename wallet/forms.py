@@ -0,0 +1,44 @@
+from django import forms
+from decimal import Decimal
+from .models import DiceGame
+
+SINGLE_VALUE_ERROR = "For single number bet, choose a number between 1 and 6"
+
+
+class DiceBetForm(forms.Form):
+    """
+    Validates a bet posted to place_bet_api before any database work
+    """
+    bet_amount = forms.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=Decimal('0.01'),
+        error_messages={
+            'required': 'Please enter a bet amount',
+            'invalid': 'Please enter a valid bet amount',
+            'min_value': 'Bet amount must be positive',
+        }
+    )
+    bet_type = forms.ChoiceField(
+        choices=DiceGame.BET_TYPES,
+        error_messages={
+            'required': 'Please choose a bet type',
+            'invalid_choice': 'Invalid bet type',
+        }
+    )
+    bet_value = forms.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=6,
+        error_messages={
+            'invalid': SINGLE_VALUE_ERROR,
+            'min_value': SINGLE_VALUE_ERROR,
+            'max_value': SINGLE_VALUE_ERROR,
+        }
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('bet_type') == 'SINGLE' and not cleaned_data.get('bet_value'):
+            raise forms.ValidationError(SINGLE_VALUE_ERROR)
+        return cleaned_data
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from wallet.models import GameStats
+
+
+class Command(BaseCommand):
+    """
+    Create the GameStats row for users registered before it was made at signup
+    Usage: python manage.py backfill_game_stats [--batch-size 1000]
+    """
+    help = "Create missing GameStats rows"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        missing = get_user_model().objects.filter(game_stats__isnull=True).values_list('pk', flat=True)
+        created = GameStats.objects.bulk_create(
+            (GameStats(user_id=user_id) for user_id in missing.iterator()),
+            batch_size=options['batch_size'],
+            ignore_conflicts=True
+        )
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} GameStats rows"))
@@ -1,28 +1,34 @@
 # game/models.py
 from django.db import models
-from django.contrib.auth.models import User
+from django.conf import settings
+from django.utils.functional import cached_property
 from decimal import Decimal
 import uuid
 
 
+# Module level so DiceGame.Meta's constraints can be built from them
+BET_TYPES = [
+    ('SINGLE', 'Single Number'),
+    ('EVEN', 'Even Numbers'),
+    ('ODD', 'Odd Numbers'),
+    ('HIGH', 'High (4-6)'),
+    ('LOW', 'Low (1-3)'),
+]
+
+# Games resolve inside place_bet, so every stored game is won or lost
+GAME_STATUS_CHOICES = [
+    ('WON', 'Won'),
+    ('LOST', 'Lost'),
+]
+
+
 class DiceGame(models.Model):
     """Record of each dice game played"""
-    BET_TYPES = [
-        ('SINGLE', 'Single Number'),
-        ('EVEN', 'Even Numbers'),
-        ('ODD', 'Odd Numbers'),
-        ('HIGH', 'High (4-6)'),
-        ('LOW', 'Low (1-3)'),
-    ]
-
-    STATUS_CHOICES = [
-        ('ACTIVE', 'Active'),
-        ('WON', 'Won'),
-        ('LOST', 'Lost'),
-    ]
+    BET_TYPES = BET_TYPES
+    STATUS_CHOICES = GAME_STATUS_CHOICES
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='games')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='games')
     bet_amount = models.DecimalField(max_digits=10, decimal_places=2)
     bet_type = models.CharField(max_length=20, choices=BET_TYPES)
     bet_value = models.IntegerField(null=True, blank=True)  # For SINGLE bets
@@ -30,17 +36,37 @@ class DiceGame(models.Model):
     dice_result = models.IntegerField(null=True, blank=True)  # The rolled number (1-6)
     payout_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     
-    status = models.CharField(max_choices=20, choices=STATUS_CHOICES, default='ACTIVE')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set once the game has been folded into GameStats (see DiceGameService.apply_pending_stats)
+    stats_applied = models.BooleanField(default=False)
     
     class Meta:
         db_table = 'dice_games'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['user', 'status']),
+            models.Index(
+                fields=['created_at'], condition=models.Q(stats_applied=False),
+                name='dice_games_stats_pending_idx'
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(status__in=[status for status, _ in GAME_STATUS_CHOICES]),
+                name='dicegame_status_valid'
+            ),
+            models.CheckConstraint(
+                condition=models.Q(bet_type__in=[bet_type for bet_type, _ in BET_TYPES]),
+                name='dicegame_bet_type_valid'
+            ),
+        ]
     
     def __str__(self):
-        return f"Game {self.id} - {self.user.username} - ${self.bet_amount}"
+        return f"Game {self.id} - {self.user.email} - ${self.bet_amount}"
     
-    @property
+    @cached_property
     def profit(self):
         """Calculate profit/loss"""
         if self.status == 'WON':
@@ -52,7 +78,7 @@ class DiceGame(models.Model):
 
 class GameStats(models.Model):
     """User gaming statistics"""
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='game_stats')
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='game_stats')
     total_games = models.IntegerField(default=0)
     total_wins = models.IntegerField(default=0)
     total_losses = models.IntegerField(default=0)
@@ -65,18 +91,22 @@ class GameStats(models.Model):
     class Meta:
         db_table = 'game_stats'
         verbose_name_plural = 'Game Stats'
+        indexes = [
+            # Leaderboard reads the top rows straight off this index
+            models.Index(fields=['-total_won'], name='game_stats_total_won_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.user.username}'s Stats"
+        return f"{self.user.email}'s Stats"
     
-    @property
+    @cached_property
     def win_rate(self):
         """Calculate win percentage"""
         if self.total_games == 0:
             return 0
         return (self.total_wins / self.total_games) * 100
     
-    @property
+    @cached_property
     def net_profit(self):
         """Calculate net profit/loss"""
         return self.total_won - self.total_wagered
\ No newline at end of file
@@ -1,14 +1,36 @@
 # game/services.py
+from django.conf import settings
 from django.db import transaction
+from django.core.cache import cache
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 from decimal import Decimal
-import random
+import os
+import threading
 from .models import DiceGame, GameStats
-from wallet.services import WalletService
-from wallet.models import Wallet
+from apps.wallet.models import Wallet, Transaction
+from config.celery import app as celery_app
 import logging
 
 logger = logging.getLogger(__name__)
 
+_BET_TYPES = frozenset(bet_type for bet_type, _ in DiceGame.BET_TYPES)
+
+_rolls = threading.local()
+
+
+def _next_roll():
+    """Return a fair die face (1-6), drawing 256 random bytes at a time from os.urandom"""
+    while True:
+        if not getattr(_rolls, 'pos', 0):
+            _rolls.buf = os.urandom(256)
+            _rolls.pos = 256
+        _rolls.pos -= 1
+        byte = _rolls.buf[_rolls.pos]
+        # 252 is the largest multiple of 6 below 256; rejecting the rest keeps faces uniform
+        if byte < 252:
+            return byte % 6 + 1
+
 
 class DiceGameService:
     """Service for handling dice game logic"""
@@ -22,37 +44,53 @@ class DiceGameService:
         'LOW': Decimal('2.00'),       # Bet on 1-3: 2x
     }
     
+    # Faces that win for each range bet; SINGLE is checked against bet_value
+    WIN_SETS = {
+        'EVEN': frozenset({2, 4, 6}),
+        'ODD': frozenset({1, 3, 5}),
+        'HIGH': frozenset({4, 5, 6}),
+        'LOW': frozenset({1, 2, 3}),
+    }
+    
+    # Columns the game lists display
+    GAME_LIST_FIELDS = (
+        'id', 'bet_type', 'bet_amount', 'dice_result', 'payout_amount', 'status', 'created_at',
+    )
+    
+    # Most pending games folded into GameStats per flush
+    STATS_BATCH_SIZE = 1000
+    
+    # Leaderboard is the same for every user; dropped when a win moves total_won
+    LEADERBOARD_CACHE_KEY = 'game:leaderboard:{}'
+    LEADERBOARD_CACHE_TIMEOUT = 30
+    LEADERBOARD_SIZE = 20
+    
     @staticmethod
     def roll_dice():
         """Roll a dice and return result (1-6)"""
-        return random.randint(1, 6)
+        return _next_roll()
     
     @staticmethod
     def check_win(bet_type, bet_value, dice_result):
         """Check if the bet won"""
         if bet_type == 'SINGLE':
             return dice_result == bet_value
-        elif bet_type == 'EVEN':
-            return dice_result % 2 == 0
-        elif bet_type == 'ODD':
-            return dice_result % 2 != 0
-        elif bet_type == 'HIGH':
-            return dice_result >= 4
-        elif bet_type == 'LOW':
-            return dice_result <= 3
-        return False
+        return dice_result in DiceGameService.WIN_SETS.get(bet_type, ())
     
     @staticmethod
     @transaction.atomic
     def place_bet(user, bet_amount, bet_type, bet_value=None):
-        """Place a bet and play the game"""
+        """
+        Place a bet and play the game
+        Returns: (DiceGame, wallet balance after the bet settles)
+        """
         
         # Validate bet amount
         if bet_amount <= 0:
             raise ValueError("Bet amount must be positive")
         
         # Validate bet type
-        if bet_type not in dict(DiceGame.BET_TYPES):
+        if bet_type not in _BET_TYPES:
             raise ValueError("Invalid bet type")
         
         # Validate single number bet
@@ -60,88 +98,134 @@ class DiceGameService:
             if not bet_value or bet_value < 1 or bet_value > 6:
                 raise ValueError("For single number bet, choose a number between 1 and 6")
         
-        # Get user's wallet
-        wallet = Wallet.objects.select_for_update().get(user=user)
-        
-        # Check balance
-        if wallet.balance < bet_amount:
-            raise ValueError("Insufficient balance")
+        # Conditional UPDATE: no row lock, an overdraw raises ValueError
+        _, new_balance = Wallet.deduct_user(user, bet_amount, f"{bet_type} bet", Transaction.BET_PLACED)
         
-        # Deduct bet amount from wallet
-        WalletService.place_bet(wallet, bet_amount, 0, f"{bet_type} bet")
+        # Resolve the game before writing it, so the row is one INSERT
+        dice_result = DiceGameService.roll_dice()
+        is_win = DiceGameService.check_win(bet_type, bet_value, dice_result)
+        payout = bet_amount * DiceGameService.PAYOUTS[bet_type] if is_win else Decimal('0.00')
         
-        # Create game record
         game = DiceGame.objects.create(
             user=user,
             bet_amount=bet_amount,
             bet_type=bet_type,
             bet_value=bet_value,
-            status='ACTIVE'
+            dice_result=dice_result,
+            payout_amount=payout,
+            status='WON' if is_win else 'LOST'
         )
         
-        # Roll the dice
-        dice_result = DiceGameService.roll_dice()
-        game.dice_result = dice_result
-        
-        # Check if won
-        is_win = DiceGameService.check_win(bet_type, bet_value, dice_result)
-        
         if is_win:
-            # Calculate payout
-            multiplier = DiceGameService.PAYOUTS[bet_type]
-            payout = bet_amount * multiplier
-            game.payout_amount = payout
-            game.status = 'WON'
-            
             # Credit winnings
-            WalletService.credit_winnings(wallet, payout, game.id, f"Won {bet_type} bet")
+            _, new_balance = Wallet.credit_user(
+                user, payout, f"Won {bet_type} bet (Game {game.id})", Transaction.BET_WON
+            )
             
-            logger.info(f"{user.username} WON ${payout} on {bet_type} bet")
+            logger.info(f"{user.email} WON ${payout} on {bet_type} bet")
         else:
-            game.payout_amount = Decimal('0.00')
-            game.status = 'LOST'
-            logger.info(f"{user.username} LOST ${bet_amount} on {bet_type} bet")
+            logger.info(f"{user.email} LOST ${bet_amount} on {bet_type} bet")
         
-        game.save()
+        # Stats don't feed the response; the flush_game_stats task folds the
+        # game into GameStats with the rest of this user's recent bets.
+        # Without a worker and beat (Celery missing or eager) nothing would
+        # ever run it, so fold the stats once this bet commits
+        if celery_app is None or getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+            transaction.on_commit(DiceGameService.apply_pending_stats)
         
-        # Update stats
-        DiceGameService.update_stats(user, game)
-        
-        return game
+        return game, new_balance
     
     @staticmethod
-    def update_stats(user, game):
-        """Update user's game statistics"""
-        stats, created = GameStats.objects.get_or_create(user=user)
-        
-        stats.total_games += 1
-        stats.total_wagered += game.bet_amount
-        
-        if game.status == 'WON':
-            stats.total_wins += 1
-            stats.total_won += game.payout_amount
-            stats.current_streak += 1
-            
-            # Update biggest win
-            profit = game.payout_amount - game.bet_amount
-            if profit > stats.biggest_win:
-                stats.biggest_win = profit
-            
-            # Update win streak
-            if stats.current_streak > stats.win_streak:
-                stats.win_streak = stats.current_streak
+    @transaction.atomic
+    def apply_pending_stats(batch_size=STATS_BATCH_SIZE):
+        """
+        Fold games not yet counted into GameStats, one UPDATE per user
+        Returns: number of games applied
+        """
+        games = list(
+            DiceGame.objects.select_for_update().filter(stats_applied=False).order_by('created_at').values_list(
+                'id', 'user_id', 'bet_amount', 'payout_amount', 'status'
+            )[:batch_size]
+        )
+        if not games:
+            return 0
+        
+        # Oldest first per user, so the streak columns come out right
+        by_user = {}
+        for _, user_id, bet_amount, payout_amount, status in games:
+            by_user.setdefault(user_id, []).append((bet_amount, payout_amount, status))
+        for user_id, user_games in by_user.items():
+            DiceGameService._apply_stats(user_id, user_games)
+        
+        DiceGame.objects.filter(pk__in=[game[0] for game in games]).update(stats_applied=True)
+        if any(game[-1] == 'WON' for game in games):
+            cache.delete(DiceGameService.LEADERBOARD_CACHE_KEY.format(DiceGameService.LEADERBOARD_SIZE))
+        return len(games)
+    
+    @staticmethod
+    def _apply_stats(user_id, games):
+        """
+        Add a run of one user's games to their GameStats in a single UPDATE
+        games: (bet_amount, payout_amount, status) tuples, oldest first
+        """
+        # F() expressions read the row's current values, so concurrent writers don't lose counts
+        updates = {
+            'total_games': F('total_games') + len(games),
+            'total_wagered': F('total_wagered') + sum(bet for bet, _, _ in games),
+        }
+        wins = [(bet, payout) for bet, payout, status in games if status == 'WON']
+        losses = len(games) - len(wins)
+        if wins:
+            updates.update(
+                total_wins=F('total_wins') + len(wins),
+                total_won=F('total_won') + sum(payout for _, payout in wins),
+                biggest_win=Greatest(F('biggest_win'), Value(max(payout - bet for bet, payout in wins))),
+            )
+        
+        # Win runs: the one continuing the stored streak, the longest inside
+        # the window, and the one still open at the end
+        runs = [0]
+        for _, _, status in games:
+            if status == 'WON':
+                runs[-1] += 1
+            else:
+                runs.append(0)
+        
+        if not losses:
+            updates['current_streak'] = F('current_streak') + len(games)
+            updates['win_streak'] = Greatest(F('win_streak'), F('current_streak') + len(games))
         else:
-            stats.total_losses += 1
-            stats.current_streak = 0
-        
-        stats.save()
+            updates['total_losses'] = F('total_losses') + losses
+            updates['current_streak'] = runs[-1]
+            if wins:
+                updates['win_streak'] = Greatest(
+                    F('win_streak'), F('current_streak') + runs[0], Value(max(runs))
+                )
+        
+        # The row is normally created with the user (see signals); users from
+        # before that, or created without the signal, get it on first write
+        if not GameStats.objects.filter(user_id=user_id).update(**updates):
+            GameStats.objects.get_or_create(user_id=user_id)
+            GameStats.objects.filter(user_id=user_id).update(**updates)
     
     @staticmethod
     def get_game_history(user, limit=20):
         """Get user's recent games"""
-        return DiceGame.objects.filter(user=user)[:limit]
+        return DiceGame.objects.filter(user=user).only(*DiceGameService.GAME_LIST_FIELDS)[:limit]
+    
+    @staticmethod
+    def get_cached_leaderboard(limit=LEADERBOARD_SIZE):
+        """Top players, served from cache for LEADERBOARD_CACHE_TIMEOUT seconds"""
+        return cache.get_or_set(
+            DiceGameService.LEADERBOARD_CACHE_KEY.format(limit),
+            lambda: list(DiceGameService.get_leaderboard(limit)),
+            DiceGameService.LEADERBOARD_CACHE_TIMEOUT
+        )
     
     @staticmethod
     def get_leaderboard(limit=10):
         """Get top players by net profit"""
-        return GameStats.objects.all().order_by('-total_won')[:limit]
\ No newline at end of file
+        # Plain dicts with the player's email joined in; no model instances per row
+        return GameStats.objects.order_by('-total_won').values(
+            'user__email', 'total_won', 'total_wins', 'biggest_win'
+        )[:limit]
\ No newline at end of file
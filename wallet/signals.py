@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.db.models.signals import post_save
-from django.contrib.auth.models import User
 from django.dispatch import receiver
+from .models import GameStats
 
-@receiver(post_save, sender=User)
-def create_user_wallet(sender, instance, created, **kwargs):
-    """Auto-create wallet when user is created"""
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_user_game_stats(sender, instance, created, **kwargs):
+    """Auto-create game stats when user is created"""
+    # Wallets are created by WalletManager.create_wallet_for_user, which also
+    # writes the initial deposit to the ledger
     if created:
-        Wallet.objects.create(user=instance)
\ No newline at end of file
+        GameStats.objects.create(user=instance)
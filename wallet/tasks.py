@@ -0,0 +1,12 @@
+from config.celery import shared_task
+from .services import DiceGameService
+
+
+@shared_task
+def flush_game_stats():
+    """
+    Fold recently played games into GameStats
+    Runs on a short beat interval so a burst of bets from one user costs one UPDATE
+    Returns: number of games applied
+    """
+    return DiceGameService.apply_pending_stats()
@@ -0,0 +1,83 @@
+import orjson
+import pytest
+from decimal import Decimal
+from .models import DiceGame, GameStats
+from .services import DiceGameService
+from .views import place_bet_api
+
+
+@pytest.mark.django_db
+class TestGameStats:
+    """Test cases for GameStats bookkeeping"""
+    
+    def test_stats_created_with_user(self, user):
+        """Test the signup signal creates the stats row"""
+        assert GameStats.objects.filter(user=user).exists()
+    
+    def test_apply_stats_creates_missing_row(self, user):
+        """Test stats are kept for users without a stats row"""
+        GameStats.objects.filter(user=user).delete()
+        
+        DiceGameService._apply_stats(user.pk, [(Decimal('10.00'), Decimal('20.00'), 'WON')])
+        
+        stats = GameStats.objects.get(user=user)
+        assert stats.total_games == 1
+        assert stats.total_won == Decimal('20.00')
+        assert stats.biggest_win == Decimal('10.00')
+
+
+@pytest.mark.django_db
+class TestDiceViews:
+    """Test cases for the dice game views"""
+    
+    def test_place_bet_api_reports_field_errors(self, rf, user):
+        """Test validation messages survive JSON serialization"""
+        request = rf.post('/', {'bet_amount': 'abc', 'bet_type': 'EVEN'})
+        request.user = user
+        
+        response = place_bet_api(request)
+        
+        assert response.status_code == 400
+        assert orjson.loads(response.content)['errors'] == {'bet_amount': ['Please enter a valid bet amount']}
+
+
+@pytest.mark.django_db
+class TestApplyPendingStats:
+    """Test cases for the batched stats flush"""
+    
+    def test_folds_pending_games_in_order(self, user):
+        """Test one flush applies every pending game with the right streaks"""
+        for status in ('WON', 'WON', 'LOST', 'WON'):
+            DiceGame.objects.create(
+                user=user, bet_amount=Decimal('10.00'), bet_type='EVEN', dice_result=2,
+                payout_amount=Decimal('20.00') if status == 'WON' else Decimal('0.00'), status=status
+            )
+        
+        assert DiceGameService.apply_pending_stats() == 4
+        assert DiceGameService.apply_pending_stats() == 0
+        
+        stats = GameStats.objects.get(user=user)
+        assert stats.total_games == 4
+        assert stats.total_wins == 3
+        assert stats.total_losses == 1
+        assert stats.win_streak == 2
+        assert stats.current_streak == 1
+    
+    def test_place_bet_applies_stats_without_beat(self, user, wallet, settings,
+                                                  django_capture_on_commit_callbacks):
+        """Test eager mode folds the game into GameStats once the bet commits"""
+        settings.CELERY_TASK_ALWAYS_EAGER = True
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            DiceGameService.place_bet(user, Decimal('10.00'), 'EVEN')
+        
+        assert not DiceGame.objects.filter(stats_applied=False).exists()
+        assert GameStats.objects.get(user=user).total_games == 1
+    
+    def test_flush_task_is_registered(self):
+        """Test the beat schedule points at a task Celery knows about"""
+        from config.celery import app
+        from django.conf import settings
+        
+        app.autodiscover_tasks(force=True)
+        assert settings.CELERY_BEAT_SCHEDULE['flush-game-stats']['task'] in app.tasks
@@ -2,18 +2,19 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
-from decimal import Decimal
+from django.core.paginator import Paginator
+from .forms import DiceBetForm
 from .models import DiceGame, GameStats
 from .services import DiceGameService
-from wallet.models import Wallet
+from apps.wallet.models import Wallet
+from apps.wallet.utils import fast_json
 
 
 @login_required
 def play_game(request):
     """Main game interface"""
     wallet = Wallet.objects.get(user=request.user)
-    recent_games = DiceGame.objects.filter(user=request.user)[:5]
+    recent_games = DiceGameService.get_game_history(request.user, 5)
     stats, _ = GameStats.objects.get_or_create(user=request.user)
     
     context = {
@@ -29,58 +30,60 @@ def place_bet_api(request):
     """API endpoint to place a bet"""
     if request.method == 'POST':
         try:
-            bet_amount = Decimal(request.POST.get('bet_amount'))
-            bet_type = request.POST.get('bet_type')
-            bet_value = request.POST.get('bet_value')
+            form = DiceBetForm(request.POST)
+            if not form.is_valid():
+                return fast_json({
+                    'success': False,
+                    'error': next(iter(form.errors.values()))[0],
+                    # orjson would emit ErrorList as []; hand it plain strings
+                    'errors': {field: [str(message) for message in errors] for field, errors in form.errors.items()},
+                }, status=400)
             
-            if bet_value:
-                bet_value = int(bet_value)
-            
-            # Place the bet
-            game = DiceGameService.place_bet(
+            # Place the bet; the service hands back the balance its UPDATE produced
+            game, balance = DiceGameService.place_bet(
                 user=request.user,
-                bet_amount=bet_amount,
-                bet_type=bet_type,
-                bet_value=bet_value
+                bet_amount=form.cleaned_data['bet_amount'],
+                bet_type=form.cleaned_data['bet_type'],
+                bet_value=form.cleaned_data['bet_value']
             )
             
-            # Get updated wallet balance
-            wallet = Wallet.objects.get(user=request.user)
-            
-            return JsonResponse({
+            # Decimals serialize as exact strings and the UUID natively; no float() rounding
+            return fast_json({
                 'success': True,
                 'game': {
-                    'id': str(game.id),
+                    'id': game.id,
                     'dice_result': game.dice_result,
                     'status': game.status,
-                    'payout': float(game.payout_amount),
-                    'profit': float(game.profit),
+                    'payout': game.payout_amount,
+                    'profit': game.profit,
                 },
-                'balance': float(wallet.balance)
+                'balance': balance
             })
             
         except ValueError as e:
-            return JsonResponse({
+            return fast_json({
                 'success': False,
                 'error': str(e)
             }, status=400)
         except Exception as e:
-            return JsonResponse({
+            return fast_json({
                 'success': False,
                 'error': 'An error occurred'
             }, status=500)
     
-    return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+    return fast_json({'success': False, 'error': 'Invalid request'}, status=400)
 
 
 @login_required
 def game_history(request):
     """View game history"""
-    games = DiceGame.objects.filter(user=request.user)
-    stats = GameStats.objects.get(user=request.user)
+    games = DiceGame.objects.filter(user=request.user).only(*DiceGameService.GAME_LIST_FIELDS)
+    page_obj = Paginator(games, 50).get_page(request.GET.get('page'))
+    stats, _ = GameStats.objects.get_or_create(user=request.user)
     
     context = {
-        'games': games,
+        'games': page_obj,
+        'page_obj': page_obj,
         'stats': stats,
     }
     return render(request, 'game/history.html', context)
@@ -89,7 +92,7 @@ def game_history(request):
 @login_required
 def leaderboard(request):
     """View leaderboard"""
-    top_players = DiceGameService.get_leaderboard(20)
+    top_players = DiceGameService.get_cached_leaderboard()
     
     context = {
         'top_players': top_players,
@@ -100,8 +103,8 @@ def leaderboard(request):
 @login_required
 def user_stats(request):
     """View user statistics"""
-    stats = GameStats.objects.get(user=request.user)
-    recent_games = DiceGame.objects.filter(user=request.user)[:10]
+    stats, _ = GameStats.objects.get_or_create(user=request.user)
+    recent_games = DiceGameService.get_game_history(request.user, 10)
     
     context = {
         'stats': stats,